@@ -3,7 +3,25 @@
 import logging
 
 from pyoz.core import System
+from pyoz.cache import SolutionCache
+from pyoz.continuation import continuation
+from pyoz.convergence import ConvergenceRecord, BatchRecord
+from pyoz.profiler import Profiler, profile
+from pyoz.scan import Scan, scan_backend_names
+from pyoz.adaptive import AdaptiveScan
+from pyoz.boundary import trace_boundary, stability
+from pyoz.coexistence import binodal
+from pyoz.store import ResultStore
+from pyoz.archive import save_archive, load_archive
+from pyoz.shared import SharedArray, SharedArrays, share_file, attach
+from pyoz.resources import estimate_solve, plan_workers
+from pyoz.warmstart import WarmStartDB
 from pyoz.closure import closure_names
+from pyoz.engines import method_names
+from pyoz.fft import (ScipyBackend, FFTWBackend, NumpyBackend,
+                      set_fft_backend, get_fft_backend, fft_backend_names)
+from pyoz.iteration import (Picard, AdaptivePicard, Anderson, Ng,
+                            iteration_scheme_names)
 from pyoz.potentials import *
 from pyoz.properties import *
 from pyoz import unit
@@ -0,0 +1,144 @@
+"""Scans that only refine the grid where the results change.
+
+An `AdaptiveScan` starts from a coarse grid and repeatedly halves the cells
+in which solves start or stop converging, or in which a chosen property
+changes by more than a threshold between the corners. All other cells keep
+their coarse resolution:
+
+    >>> scan = oz.AdaptiveScan(OrderedDict([('kT', [1.0, 1.5, 2.0]),
+    ...                                     ('rho', [0.1, 0.4, 0.7, 1.0])]),
+    ...                        build, properties=['pressure_virial'],
+    ...                        levels=4, mix_param=0.5)
+    >>> results = scan.run()
+
+The results are arrays over the finest grid, NaN and not `completed` at the
+points that were not needed. New solves start from the closest solutions
+found so far, shared through a `pyoz.WarmStartDB`.
+
+"""
+from collections import OrderedDict
+from itertools import product
+import shutil
+import tempfile
+
+import numpy as np
+
+from pyoz.exceptions import PyozError
+from pyoz.scan import Scan
+from pyoz.warmstart import WarmStartDB
+
+
+__all__ = ['AdaptiveScan']
+
+
+class AdaptiveScan(Scan):
+    """A scan that refines the grid where the results change sharply.
+
+    Parameters
+    ----------
+    axes : OrderedDict
+        Maps parameter names to the increasing values of the coarse grid.
+    build, properties
+        As for `pyoz.Scan`.
+    levels : int, optional, default=3
+        How often cells may be halved. The finest grid has `2**levels` times
+        as many intervals along every axis as the coarse grid.
+    criterion : str, optional
+        Name of one of the properties. Cells are refined where it changes by
+        more than `threshold` between their corners, or for array valued
+        properties where any element does. By default only the boundaries of
+        convergence are refined.
+    threshold : float, optional
+        Required with `criterion`.
+    warm_start : pyoz.WarmStartDB or str or bool, optional
+        The database of initial guesses, or its directory. A temporary one
+        is used if None, none if False.
+    **scan_kwargs
+        Passed on to `pyoz.Scan`, e.g. `store` and arguments of the solve.
+
+    """
+    def __init__(self, axes, build, properties, levels=3, criterion=None,
+                 threshold=None, warm_start=None, **scan_kwargs):
+        if levels < 0:
+            raise PyozError('`levels` must not be negative.')
+        fine_axes = OrderedDict()
+        for name, values in axes.items():
+            values = np.asarray(values, dtype=float)
+            if values.ndim != 1 or values.size == 0 or np.any(
+                    np.diff(values) <= 0):
+                raise PyozError('Axis `{}` must be a non-empty, increasing '
+                                'sequence.'.format(name))
+            fine_axes[name] = np.concatenate(
+                [np.linspace(low, high, 2**levels + 1)[:-1]
+                 for low, high in zip(values[:-1], values[1:])]
+                + [values[-1:]])
+        super(AdaptiveScan, self).__init__(fine_axes, build, properties,
+                                           **scan_kwargs)
+        if criterion is not None:
+            if criterion not in self.properties:
+                raise PyozError('The criterion `{}` must be one of the '
+                                'properties.'.format(criterion))
+            if threshold is None:
+                raise PyozError('A `criterion` requires a `threshold`.')
+        self.levels = levels
+        self.criterion = criterion
+        self.threshold = threshold
+        if isinstance(warm_start, str):
+            warm_start = WarmStartDB(warm_start)
+        self.warm_start = warm_start
+
+    def run(self, workers=None, backend='process', client=None, threads=None,
+            memory_budget=None):
+        """Solve the coarse grid, then refine it level by level.
+
+        The parameters and the results are those of `pyoz.Scan.run`.
+        """
+        temporary = None
+        warm_start = self.warm_start
+        if warm_start is None:
+            temporary = tempfile.mkdtemp(prefix='pyoz_warm_start_')
+            warm_start = WarmStartDB(temporary)
+        if warm_start is not False:
+            self.solve_kwargs['warm_start'] = warm_start
+        try:
+            size = 2**self.levels
+            cells = list(product(*[range(0, max(n - 1, 1), size)
+                                   for n in self.shape]))
+            while True:
+                corners = {corner for cell in cells
+                           for corner in self._corners(cell, size)}
+                todo = [(index, self._point(index))
+                        for index in sorted(corners)
+                        if not self.completed[index]]
+                self._run(todo, workers, backend, client, threads,
+                          memory_budget)
+                if size == 1:
+                    break
+                cells = [child for cell in cells if self._refine(cell, size)
+                         for child in self._corners(cell, size // 2)]
+                size //= 2
+                if not cells:
+                    break
+        finally:
+            self.solve_kwargs.pop('warm_start', None)
+            if temporary is not None:
+                shutil.rmtree(temporary, ignore_errors=True)
+        return self.results
+
+    def _corners(self, cell, size):
+        """Points at offsets of 0 or `size` from `cell` along every axis. """
+        offsets = [(0, size) if n > 1 else (0,) for n in self.shape]
+        return [tuple(start + offset for start, offset in zip(cell, corner))
+                for corner in product(*offsets)]
+
+    def _refine(self, cell, size):
+        corners = self._corners(cell, size)
+        converged = np.array([self.results['converged'][corner]
+                              for corner in corners])
+        if converged.any() and not converged.all():
+            return True
+        if self.criterion is None or not converged.all():
+            return False
+        values = np.array([self.results[self.criterion][corner]
+                           for corner in corners])
+        return np.ptp(values, axis=0).max() > self.threshold
@@ -0,0 +1,109 @@
+"""Compact archives of converged correlation functions.
+
+Most of a correlation function is its tail, where it has decayed to its
+limiting value. An archive drops the tail below `tail_tol`, optionally
+quantizes the rest to integer multiples of `2 * precision`, stores the second
+differences of the integers along the grid, which are small for smooth
+functions, and compresses the result:
+
+    >>> lj.solve(rhos=0.6)
+    >>> oz.save_archive('lj.npz', lj, precision=1e-6)
+    >>> g_r = oz.load_archive('lj.npz')['g_r']
+
+Loaded functions have the full shape on the original grid and differ from
+the stored ones by at most `max(tail_tol, precision)`.
+
+"""
+import numpy as np
+
+from pyoz.exceptions import PyozError
+
+
+__all__ = ['save_archive', 'load_archive']
+
+# Values that the correlation functions decay to at large r or k.
+_limits = {'g_r': 1.0, 'h_r': 0.0, 'c_r': 0.0, 'e_r': 0.0, 'h_k': 0.0}
+
+
+def save_archive(path, system, functions=('g_r', 'c_r'), tail_tol=1e-10,
+                 precision=None):
+    """Store the correlation functions of a solved system.
+
+    Parameters
+    ----------
+    path : str or file
+        Where to write the archive, a `.npz` file.
+    system : pyoz.System
+        A system after a successful `System.solve`.
+    functions : tuple of str, optional, default=('g_r', 'c_r')
+        The functions to store. Valid names are 'g_r', 'h_r', 'c_r', 'e_r'
+        and 'h_k'. Any of 'e_r', 'h_r' and 'g_r' can be computed from the
+        others, so storing all of them is rarely needed.
+    tail_tol : float, optional, default=1e-10
+        Tails of the functions are dropped where they differ from their
+        limiting value by less than this for all pairs of components.
+    precision : float, optional
+        Maximum absolute error of the stored values. Values are stored
+        losslessly if None.
+
+    """
+    if system.g_r is None:
+        raise PyozError('The system has not been solved.')
+    if precision is not None and precision <= 0:
+        raise PyozError('`precision` must be positive.')
+    arrays = {'dr': system.dr, 'n_pts': system.n_pts, 'kT': system.kT,
+              'rhos': system.rho_ij.diagonal(), 'functions': list(functions),
+              'precision': np.nan if precision is None else precision}
+    for name in functions:
+        if name not in _limits:
+            raise PyozError('Unsupported function: {}. Valid options are: '
+                            '{}'.format(name, ', '.join(sorted(_limits))))
+        deviation = getattr(system, name) - _limits[name]
+        significant = np.nonzero((np.abs(deviation) >= tail_tol).any(
+            axis=(0, 1)))[0]
+        deviation = deviation[..., :significant[-1] + 1 if significant.size
+                              else 0]
+        if precision is not None:
+            deviation = _delta_encode(np.round(deviation / (2 * precision)))
+        arrays[name] = deviation
+    np.savez_compressed(path, **arrays)
+
+
+def load_archive(path):
+    """Load an archive written by `save_archive`.
+
+    Returns
+    -------
+    archive : dict
+        The stored functions on the full grid, the grids 'r' and 'k', the
+        temperature 'kT' and the densities 'rhos'.
+
+    """
+    with np.load(path) as data:
+        dr, n_pts = float(data['dr']), int(data['n_pts'])
+        precision = float(data['precision'])
+        archive = {'kT': float(data['kT']), 'rhos': data['rhos']}
+        for name in data['functions']:
+            deviation = data[name]
+            if not np.isnan(precision):
+                deviation = np.cumsum(np.cumsum(deviation, axis=-1),
+                                      axis=-1) * (2 * precision)
+            function = np.full(deviation.shape[:2] + (n_pts,), _limits[name])
+            function[..., :deviation.shape[-1]] += deviation
+            archive[str(name)] = function
+    # The grids of `System`.
+    dk = np.pi / (dr * n_pts)
+    archive['r'] = np.linspace(dr, n_pts * dr - dr, n_pts)
+    archive['k'] = np.linspace(dk, n_pts * dk - dk, n_pts)
+    return archive
+
+
+def _delta_encode(values):
+    """Second differences along the grid in the smallest integer type. """
+    deltas = np.diff(values, n=2, axis=-1,
+                     prepend=np.zeros(values.shape[:-1] + (2,)))
+    largest = np.abs(deltas).max() if deltas.size else 0
+    for dtype in (np.int8, np.int16, np.int32):
+        if largest <= np.iinfo(dtype).max:
+            return deltas.astype(dtype)
+    return deltas.astype(np.int64)
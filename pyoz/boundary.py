@@ -0,0 +1,170 @@
+"""Trace the line beyond which a system has no solution.
+
+For every value of one parameter, `trace_boundary` walks another parameter
+from a point with a solution towards one without, every solve starting from
+the last solution. Once a solve fails, the interval between the last
+solution and the closest failed solve is bisected until it is within `tol`.
+Where a `criterion` that goes to zero at the boundary, by default the
+inverse of the structure factor at the smallest wave vector, extrapolates to
+a boundary within the next step, the step is shortened to approach it.
+Slices are traced in parallel:
+
+    >>> def build(kT, rho):
+    ...     lj = oz.System(kT=kT)
+    ...     lj.set_interaction(0, 0, oz.lennard_jones(lj.r, eps=1, sig=1))
+    ...     return lj, rho
+    >>> line = oz.trace_boundary(build, 'kT', [1.0, 1.1, 1.2],
+    ...                          'rho', bracket=(0.01, 0.4), tol=1e-3,
+    ...                          method='nk')
+    >>> line['lower']  # The densities of the last solutions.
+
+"""
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import pyoz as oz
+from pyoz.exceptions import PyozError
+from pyoz.resources import available_cpus
+from pyoz.scan import unpack_build
+
+
+__all__ = ['trace_boundary', 'stability']
+
+
+def stability(system):
+    """Return the inverse of the largest eigenvalue of S(k) at the smallest k.
+
+    It is positive for stable solutions and approaches zero at the spinodal.
+    """
+    S_0 = np.eye(system.n_components) + system.h_k[:, :, 0]
+    return 1 / np.linalg.eigvalsh(S_0).max()
+
+
+def trace_boundary(build, axis, values, parameter, bracket, tol=1e-3,
+                   n_steps=8, criterion=stability, workers=None,
+                   backend='process', **solve_kwargs):
+    """Find the boundary of the region in which a system has solutions.
+
+    Parameters
+    ----------
+    build : callable
+        Called as `build(**{axis: value, parameter: x})`. It must return the
+        system and the densities to pass to `System.solve`, optionally
+        followed by a dict of further arguments for the solve. Must be
+        picklable for the 'process' backend.
+    axis : str
+        Name of the parameter along the boundary.
+    values : list-like
+        Values of `axis` at which the boundary is located.
+    parameter : str
+        Name of the parameter that is searched.
+    bracket : tuple of float
+        `(inside, outside)`: where solves converge and towards which the
+        boundary is searched. `outside` may be smaller than `inside`.
+    tol : float, optional, default=1e-3
+        Width of the final bracket.
+    n_steps : int, optional, default=8
+        The initial step is `1 / n_steps` of the bracket.
+    criterion : callable, optional, default=stability
+        Called with a converged system, it must approach zero at the
+        boundary. None to only bisect.
+    workers : int, optional
+        Number of processes. Defaults to one per slice, up to the number of
+        available cores.
+    backend : str, optional, default='process'
+        'process' or 'serial'.
+    **solve_kwargs
+        Passed on to `System.solve`.
+
+    Returns
+    -------
+    boundary : OrderedDict of np.ndarray
+        The `values` of `axis`; 'lower' and 'upper', the last converged and
+        the first failed value of `parameter`, NaN if the first solve fails
+        or no boundary lies within the bracket; and 'n_solves' per slice.
+
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim != 1 or values.size == 0:
+        raise PyozError('`values` must be a non-empty, one dimensional '
+                        'sequence.')
+    if tol <= 0 or n_steps < 1:
+        raise PyozError('`tol` and `n_steps` must be positive.')
+    if backend not in ('process', 'serial'):
+        raise PyozError('Unsupported backend: {}'.format(backend))
+    args = [(build, axis, value, parameter, tuple(bracket), tol, n_steps,
+             criterion, solve_kwargs) for value in values]
+    if backend == 'serial':
+        slices = [_trace_slice(*slice_args) for slice_args in args]
+    else:
+        workers = workers or min(values.size, available_cpus())
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            slices = list(executor.map(_trace_slice, *zip(*args)))
+    lower, upper, n_solves = zip(*slices)
+    return OrderedDict([(axis, values), ('lower', np.array(lower)),
+                        ('upper', np.array(upper)),
+                        ('n_solves', np.array(n_solves))])
+
+
+def _trace_slice(build, axis, value, parameter, bracket, tol, n_steps,
+                 criterion, solve_kwargs):
+    """Bracket and narrow the boundary along one slice. """
+    n_solves = 0
+
+    def solve(x, e_r):
+        nonlocal n_solves
+        n_solves += 1
+        system, rhos, kwargs = unpack_build(
+            build(**{axis: value, parameter: x}), solve_kwargs)
+        kwargs['initial_e_r'] = e_r
+        e_r = system.solve(rhos, **kwargs)[2]
+        if not system.solve_info['converged']:
+            return None, None
+        return e_r, criterion(system) if criterion is not None else None
+
+    inside, outside = bracket
+    e_r, measure = solve(inside, None)
+    if e_r is None:
+        oz.logger.info('No solution at {}={}, {}={}'.format(
+            axis, value, parameter, inside))
+        return np.nan, np.nan, n_solves
+    # Converged points as (parameter, criterion), most recent last.
+    converged = [(inside, measure)]
+
+    # Every solve starts from the last solution, so the boundary is only
+    # accepted after a failure from within `tol` of it.
+    lower, upper = inside, None
+    step = (outside - inside) / n_steps
+    while upper is None or abs(upper - lower) > tol:
+        if lower == outside:
+            oz.logger.info('No boundary at {}={} between {}={} and {}'.format(
+                axis, value, parameter, inside, outside))
+            return np.nan, np.nan, n_solves
+        if upper is None:
+            x = lower + step
+            if ((x - outside) * step > 0
+                    or abs(outside - x) < 1e-12 * max(abs(outside), 1)):
+                x = outside
+        else:
+            # Bisect once a failed solve bounds the boundary.
+            x = (lower + upper) / 2
+        if criterion is not None and len(converged) >= 2:
+            (x_0, measure_0), (x_1, measure_1) = converged[-2:]
+            if measure_0 != measure_1:
+                target = x_1 - measure_1 * (x_1 - x_0) / (measure_1 -
+                                                          measure_0)
+                # Approach a boundary predicted within the step.
+                if 0 < (target - lower) / (x - lower) < 1:
+                    x = lower + max(0.9 * (target - lower),
+                                    np.copysign(tol / 2, step), key=abs)
+                    if upper is not None and (x - upper) * step >= 0:
+                        x = (lower + upper) / 2
+        new_e_r, measure = solve(x, e_r)
+        if new_e_r is None:
+            upper = x
+        else:
+            lower, e_r = x, new_e_r
+            converged.append((x, measure))
+    return lower, upper, n_solves
@@ -0,0 +1,124 @@
+"""On-disk cache of converged solutions.
+
+Solutions are stored as one compressed `.npz` file per solve, named after a
+hash of everything that determines the solution: the potentials, the grid,
+the temperature, the densities, the closure, the precision and the
+tolerance. Files are written atomically, so several processes may share a
+cache directory. When the cache grows beyond `max_bytes`, the least recently
+used solutions are removed.
+
+    >>> cache = oz.SolutionCache('~/.pyoz_cache', max_bytes=2e9)
+    >>> lj.solve(rhos=0.6, cache=cache)  # Solves and stores.
+    >>> lj.solve(rhos=0.6, cache=cache)  # Loads.
+
+"""
+import hashlib
+import os
+
+import numpy as np
+
+from pyoz.exceptions import PyozError
+from pyoz.misc import atomic_savez
+
+
+__all__ = ['SolutionCache']
+
+
+class SolutionCache(object):
+    """A directory of converged solutions.
+
+    Parameters
+    ----------
+    directory : str
+        Where to store the solutions. Created if it does not exist.
+    max_bytes : int, optional
+        Size limit of the cache. Least recently used solutions are removed
+        when it is exceeded. Unlimited by default.
+
+    """
+    def __init__(self, directory, max_bytes=None):
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    def key(self, system, rhos, closure_name, tol, reference_system=None):
+        """Return the hash identifying a solve of `system`. """
+        sha = hashlib.sha256()
+        U_r = np.ascontiguousarray(system.U_r, dtype=float)
+        sha.update(repr(U_r.shape).encode())
+        sha.update(U_r.tobytes())
+        if reference_system is not None:
+            sha.update(np.ascontiguousarray(reference_system.U_r,
+                                            dtype=float).tobytes())
+        rhos = np.atleast_1d(np.asarray(rhos, dtype=float))
+        sha.update(rhos.tobytes())
+        for value in (system.dr, system.n_pts, float(system.kT),
+                      closure_name.lower(), float(tol), system.precision):
+            sha.update(repr(value).encode())
+        return sha.hexdigest()
+
+    def get(self, key):
+        """Return the stored `(e_r, c_r, H_k)` for a key or None. """
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                arrays = data['e_r'], data['c_r'], data['H_k']
+        except (IOError, OSError, KeyError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return arrays
+
+    def put(self, key, e_r, c_r, H_k):
+        """Store a solution and evict old ones if the cache is too large. """
+        atomic_savez(self._path(key), compressed=True, e_r=e_r, c_r=c_r,
+                     H_k=H_k)
+        if self.max_bytes is not None:
+            self.evict(self.max_bytes)
+
+    def evict(self, max_bytes):
+        """Remove least recently used solutions until below `max_bytes`. """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.npz'):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Remove all stored solutions. """
+        self.evict(0)
+
+    def __len__(self):
+        return sum(1 for name in os.listdir(self.directory)
+                   if name.endswith('.npz'))
+
+    def __repr__(self):
+        return '<SolutionCache; {}; {} solutions>'.format(self.directory,
+                                                          len(self))
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+
+def make_cache(cache):
+    """Return a cache from a `SolutionCache` or a directory name. """
+    if cache is None or isinstance(cache, SolutionCache):
+        return cache
+    if isinstance(cache, str):
+        return SolutionCache(cache)
+    raise PyozError('`cache` must be a SolutionCache or a directory name.')
@@ -1,18 +1,23 @@
 import numpy as np
 
 
-def hypernetted_chain(U_r, e_r, kT, **kwargs):
+def hypernetted_chain(U_r, e_r, kT, out=None, **kwargs):
     """Apply the hyper-netted chains closure.
 
     g_r = exp(-U) * exp(e_r)
     c_r = exp(-U) * exp(e_r) - e_r - 1
 
     """
-    c_r = np.exp(-U_r / kT + e_r) - e_r - 1
+    c_r = _output_array(U_r, e_r, kT, out)
+    np.divide(U_r, -kT, out=c_r)
+    c_r += e_r
+    np.exp(c_r, out=c_r)
+    c_r -= e_r
+    c_r -= 1
     return c_r
 
 
-def reference_hypernetted_chain(U_r, e_r, kT, **kwargs):
+def reference_hypernetted_chain(U_r, e_r, kT, out=None, **kwargs):
     """Apply the hyper-netted chains closure.
 
     g_r = exp(-U) * exp(e_r)
@@ -24,22 +29,39 @@ def reference_hypernetted_chain(U_r, e_r, kT, **kwargs):
     e_r_ref = ref_system.e_r
     U_r_ref = ref_system.U_r
 
-    dU = U_r - U_r_ref
-    dG = e_r - e_r_ref
-    c_r = g_r_ref * np.exp(-dU / kT + dG) - e_r - 1
+    c_r = _output_array(U_r, e_r, kT, out)
+    np.subtract(U_r, U_r_ref, out=c_r)
+    c_r /= -kT
+    c_r += e_r
+    c_r -= e_r_ref
+    np.exp(c_r, out=c_r)
+    c_r *= g_r_ref
+    c_r -= e_r
+    c_r -= 1
     return c_r
 
 
-def percus_yevick(U_r, e_r, kT, **kwargs):
+def percus_yevick(U_r, e_r, kT, out=None, **kwargs):
     """Apply the Percus-Yevick closure.
 
     g_r = exp(-U) * (1 + e_r)
     c_r = exp(-U) * (1 + e_r) - e_r - 1
 
     """
-    c_r = np.exp(-U_r / kT) * (1 + e_r) - e_r - 1
+    c_r = _output_array(U_r, e_r, kT, out)
+    np.divide(U_r, -kT, out=c_r)
+    np.expm1(c_r, out=c_r)
+    c_r *= e_r + 1
     return c_r
 
+
+def _output_array(U_r, e_r, kT, out):
+    """Return `out` or a new array to write the result of a closure to. """
+    if out is None:
+        out = np.empty(shape=np.broadcast(U_r, e_r, kT).shape,
+                       dtype=np.result_type(U_r, e_r))
+    return out
+
 supported_closures = {'hnc': hypernetted_chain,
                       'hypernetted chain': hypernetted_chain,
                       'hyper-netted chain': hypernetted_chain,
@@ -0,0 +1,215 @@
+"""Coexisting densities of two fluid phases.
+
+At a given temperature, `binodal` solves the vapor and the liquid branch of a
+one component system and moves their densities until pressure and chemical
+potential agree. The densities are updated by Newton steps in the logarithm
+of the densities. Derivatives along each branch start as finite differences
+and are then updated by secants through the last two solutions, and every
+solve starts from the last solution on its branch. The binodal is followed
+by continuation in temperature, with densities extrapolated from the last
+two temperatures:
+
+    >>> def build(kT, rho):
+    ...     fluid = oz.System(kT=kT)
+    ...     fluid.set_interaction(0, 0, U_r)
+    ...     return fluid, rho
+    >>> line = oz.binodal(build, [0.40, 0.42], densities=(0.015, 0.4),
+    ...                   method='nk')
+    >>> line['rho_vapor'], line['rho_liquid']
+
+The pressure is computed via the virial route and the chemical potential from
+the closure, so only hypernetted chain closures are supported. The two routes
+are not consistent; the binodal is that of the closure with these routes.
+
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+import pyoz as oz
+from pyoz.exceptions import PyozError
+from pyoz.properties import pressure_virial, excess_chemical_potential
+from pyoz.scan import unpack_build
+
+
+__all__ = ['binodal']
+
+
+def binodal(build, kTs, densities, tol=1e-6, max_iter=20, max_step=0.5,
+            fd_step=1e-4, min_step=None, **solve_kwargs):
+    """Find the coexisting densities along a range of temperatures.
+
+    Parameters
+    ----------
+    build : callable
+        Called as `build(kT=kT, rho=rho)`. It must return a one component
+        system and the densities to pass to `System.solve`, optionally
+        followed by a dict of further arguments for the solve.
+    kTs : list-like
+        Temperatures at which coexistence is found, in the order in which
+        they are visited.
+    densities : tuple of float
+        Initial guesses of the vapor and the liquid density at `kTs[0]`.
+    tol : float, optional, default=1e-6
+        Largest accepted difference of pressure and chemical potential,
+        divided by `kT`.
+    max_iter : int, optional, default=20
+        Largest number of Newton steps per temperature.
+    max_step : float, optional, default=0.5
+        Largest change of the logarithm of a density in one step.
+    fd_step : float, optional, default=1e-4
+        Step in the logarithm of the density of finite differences.
+    min_step : float, optional
+        The binodal is abandoned when the step in temperature has to be
+        halved below this value. Defaults to 1/64 of the spacing of `kTs`.
+    **solve_kwargs
+        Passed on to `System.solve`.
+
+    Returns
+    -------
+    binodal : OrderedDict of np.ndarray
+        'kT'; 'rho_vapor' and 'rho_liquid', the coexisting densities;
+        'pressure' and 'mu', the pressure and the chemical potential of the
+        vapor, with the ideal part `kT * ln(rho)`; and 'n_solves', the solves
+        needed to reach every temperature. Temperatures beyond the point
+        where the binodal had to be abandoned, e.g. close to the critical
+        point, are NaN.
+
+    """
+    kTs = np.asarray(kTs, dtype=float)
+    if kTs.ndim != 1 or kTs.size == 0:
+        raise PyozError('`kTs` must be a non-empty, one dimensional '
+                        'sequence.')
+    densities = np.asarray(densities, dtype=float)
+    if (densities.shape != (2,) or (densities <= 0).any()
+            or densities[0] >= densities[1]):
+        raise PyozError('`densities` must be a positive vapor density and a '
+                        'larger liquid density.')
+    if tol <= 0 or max_iter < 1 or max_step <= 0 or fd_step <= 0:
+        raise PyozError('`tol`, `max_iter`, `max_step` and `fd_step` must '
+                        'be positive.')
+    step = np.abs(np.diff(kTs)).max() if kTs.size > 1 else 1.0
+    max_kT_step = step
+    if min_step is None:
+        min_step = step / 64
+    n_solves = 0
+
+    def state(kT, x, e_r):
+        """Solve one branch at density exp(x); return beta (P, mu), e_r. """
+        nonlocal n_solves
+        n_solves += 1
+        system, rhos, kwargs = unpack_build(build(kT=kT, rho=np.exp(x)),
+                                            solve_kwargs)
+        if system.n_components != 1:
+            raise PyozError('Coexistence is only supported for one component '
+                            'systems.')
+        kwargs['initial_e_r'] = e_r
+        e_r = system.solve(rhos, **kwargs)[2]
+        if not system.solve_info['converged']:
+            return None, None
+        mu = kT * x + excess_chemical_potential(system)[0]
+        return np.array([pressure_virial(system), mu]) / kT, e_r
+
+    results = OrderedDict([('kT', kTs)] + [
+        (name, np.full(kTs.size, np.nan))
+        for name in ('rho_vapor', 'rho_liquid', 'pressure', 'mu',
+                     'n_solves')])
+    # The last two points on the binodal, as (kT, log densities, e_rs).
+    path = []
+    n_done = 0
+    while n_done < kTs.size:
+        target = kTs[n_done]
+        if not path:
+            kT, x, e_rs = target, np.log(densities), (None, None)
+        else:
+            current, x, e_rs = path[-1]
+            distance = target - current
+            kT = current + np.sign(distance) * min(step, abs(distance))
+            if abs(target - kT) < 1e-12 * max(abs(target), 1):
+                kT = target
+            if len(path) == 2 and kT != current:
+                (kT_0, x_0, _), _ = path
+                x = x + (kT - current) / (current - kT_0) * (x - x_0)
+
+        found = _coexistence(state, kT, x, e_rs, tol, max_iter, max_step,
+                             fd_step)
+        if found is None:
+            step /= 2
+            if not path or step < min_step:
+                oz.logger.info('No coexistence found at kT={}'.format(kT))
+                break
+            continue
+        x, f, e_rs = found
+        path.append((kT, x, e_rs))
+        del path[:-2]
+        step = min(step * 2, max_kT_step)
+        if kT == target:
+            rho_vapor, rho_liquid = np.exp(x)
+            values = (rho_vapor, rho_liquid, f[0, 0] * kT, f[0, 1] * kT,
+                      n_solves)
+            for name, value in zip(list(results)[1:], values):
+                results[name][n_done] = value
+            n_solves = 0
+            n_done += 1
+    return results
+
+
+def _coexistence(state, kT, x, e_rs, tol, max_iter, max_step, fd_step):
+    """Newton iteration on the log densities of the vapor and the liquid.
+
+    Returns the log densities, beta (P, mu) of both branches and their e_r,
+    or None if the iteration fails or the branches merge.
+    """
+    f, e_rs = zip(*[state(kT, x_i, e_r) for x_i, e_r in zip(x, e_rs)])
+    if f[0] is None or f[1] is None:
+        return None
+    f, e_rs = np.array(f), list(e_rs)
+    # Derivatives of beta (P, mu) of each branch with respect to its log
+    # density, from finite differences or secants.
+    slopes = [None, None]
+    secant = False
+    for _ in range(max_iter):
+        residual = f[1] - f[0]
+        if np.abs(residual).max() < tol:
+            return x, f, e_rs
+        for i in range(2):
+            if slopes[i] is None:
+                f_step = state(kT, x[i] + fd_step, e_rs[i])[0]
+                if f_step is None:
+                    return None
+                slopes[i] = (f_step - f[i]) / fd_step
+        jacobian = np.column_stack([-slopes[0], slopes[1]])
+        try:
+            dx = -np.linalg.solve(jacobian, residual)
+        except np.linalg.LinAlgError:
+            return None
+        dx *= min(1, max_step / np.abs(dx).max())
+
+        # Halve the step until both solves converge, the branches stay
+        # apart and the residual decreases.
+        while True:
+            new_x = x + dx
+            trial = [state(kT, x_i, e_r) for x_i, e_r in zip(new_x, e_rs)]
+            if (trial[0][0] is not None and trial[1][0] is not None
+                    and new_x[1] - new_x[0] > fd_step
+                    and (np.linalg.norm(trial[1][0] - trial[0][0])
+                         < np.linalg.norm(residual))):
+                break
+            dx /= 2
+            if np.abs(dx).max() < fd_step:
+                trial = None
+                break
+        if trial is None:
+            if not secant:
+                return None
+            # The secants were poor, start over from finite differences.
+            slopes, secant = [None, None], False
+            continue
+
+        new_f = np.array([trial[0][0], trial[1][0]])
+        for i in range(2):
+            if abs(dx[i]) > fd_step:
+                slopes[i] = (new_f[i] - f[i]) / dx[i]
+                secant = True
+        x, f, e_rs = new_x, new_f, [trial[0][1], trial[1][1]]
+    return None
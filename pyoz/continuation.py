@@ -0,0 +1,136 @@
+import numpy as np
+
+import pyoz as oz
+from pyoz.exceptions import PyozError
+
+
+__all__ = ['continuation']
+
+
+def continuation(system, values, update, step=None, min_step=None,
+                 extrapolate=True, easy_iter=25, grow=2.0, **solve_kwargs):
+    """Solve a system along a path in any parameter, one warm start at a time.
+
+    Every solve starts from the converged `e_r` of the previous point on the
+    path, or from a linear extrapolation of the last two. When a solve fails
+    the step is halved, when a solve converges in at most `easy_iter`
+    iterations the step grows by a factor `grow`. Intermediate points are
+    inserted between the requested `values` as needed.
+
+    Parameters
+    ----------
+    system : pyoz.System
+        The system to solve.
+    values : list-like
+        The parameter values at which results are returned, in the order in
+        which they are visited.
+    update : callable
+        Called as `update(value)` before every solve. It must return the
+        densities to pass to `System.solve` and may modify the system, e.g.
+        its temperature or interactions.
+    step : float, optional
+        The initial and largest step between two solves. Defaults to the
+        spacing of `values`.
+    min_step : float, optional
+        The path is abandoned when the step has to be halved below this
+        value. Defaults to `step / 1024`.
+    extrapolate : bool, optional, default=True
+        Linearly extrapolate the initial `e_r` from the last two points.
+    easy_iter : int, optional, default=25
+        Solves that converge within this number of iterations grow the step.
+    grow : float, optional, default=2.0
+        Factor by which the step grows after an easy solve.
+    **solve_kwargs
+        Passed on to `System.solve`. `initial_e_r` is only used for the first
+        value.
+
+    Returns
+    -------
+    results : list of tuple
+        The `(g_r, c_r, e_r, H_k)` returned by `System.solve` for every value.
+        Values beyond the point where the path had to be abandoned are NaN
+        filled.
+
+    Examples
+    --------
+    Compress a Lennard-Jones fluid:
+
+    >>> lj = oz.System(kT=1.2)
+    >>> lj.set_interaction(0, 0, oz.lennard_jones(lj.r, eps=1, sig=1))
+    >>> results = oz.continuation(lj, [0.1, 0.5, 0.75], update=lambda rho: rho)
+
+    Cool it at fixed density:
+
+    >>> def set_kT(kT):
+    ...     lj.kT = kT
+    ...     return 0.5
+    >>> results = oz.continuation(lj, [2.0, 1.0], update=set_kT, step=0.1)
+
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim != 1 or values.size == 0:
+        raise PyozError('`values` must be a non-empty, one dimensional '
+                        'sequence.')
+    if step is None:
+        step = np.abs(np.diff(values)).max() if values.size > 1 else 1.0
+    if step <= 0:
+        raise PyozError('`step` must be positive.')
+    if min_step is None:
+        min_step = step / 1024
+    max_step = step
+    logger = oz.logger
+
+    # The last two accepted points on the path, as (value, e_r).
+    path = []
+
+    def attempt(value, initial_e_r):
+        solve_kwargs['initial_e_r'] = initial_e_r
+        result = system.solve(update(value), **solve_kwargs)
+        if system.solve_info['converged']:
+            path.append((value, result[2]))
+            del path[:-2]
+            return result
+        return None
+
+    results = [None] * values.size
+    results[0] = attempt(values[0], solve_kwargs.pop('initial_e_r', None))
+    if results[0] is None:
+        logger.info('Continuation failed at the first value: {}'.format(
+            values[0]))
+
+    n_done = 1 if results[0] is not None else 0
+    while 0 < n_done < values.size:
+        target = values[n_done]
+        current, e_r = path[-1]
+        distance = target - current
+        if distance == 0:
+            results[n_done] = results[n_done - 1]
+            n_done += 1
+            continue
+        value = current + np.sign(distance) * min(step, abs(distance))
+        if abs(target - value) < 1e-12 * max(abs(target), 1):
+            value = target
+
+        result = None
+        if extrapolate and len(path) == 2:
+            (value_0, e_r_0), _ = path
+            slope = (value - current) / (current - value_0)
+            result = attempt(value, e_r + slope * (e_r - e_r_0))
+        if result is None:
+            result = attempt(value, e_r)
+
+        if result is None:
+            step /= 2
+            if step < min_step:
+                logger.info('Continuation abandoned between {} and {}'.format(
+                    current, value))
+                break
+            continue
+        if system.solve_info['n_iter'] <= easy_iter:
+            step = min(step * grow, max_step)
+        if value == target:
+            results[n_done] = result
+            n_done += 1
+
+    return [result if result is not None else system.nan_arrays
+            for result in results]
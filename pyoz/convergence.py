@@ -0,0 +1,197 @@
+import numpy as np
+
+
+__all__ = ['ConvergenceRecord', 'BatchRecord']
+
+
+class ConvergenceRecord(object):
+    """The convergence history of a single solve.
+
+    After `System.solve`, the record is available as `System.solve_info`.
+    Iteration counts may also be accessed like dict entries, e.g.
+    `record['n_iter']`.
+
+    Attributes
+    ----------
+    converged : bool
+        Whether the solve converged.
+    reason : str
+        Why the iteration stopped: 'converged', 'max_iter', 'diverged',
+        'callback', 'line_search' or 'unstable'. Solutions loaded from a
+        `pyoz.SolutionCache` are 'cached'. The single precision stage of a
+        mixed precision solve may also stop when 'stalled'.
+    n_iter : int
+        Number of iterations, or Newton steps for the Newton-type methods.
+    n_map_evals : int
+        Number of passes through the closure and the OZ equation.
+    n_linear_iter : int
+        Number of Jacobian-vector products of the Newton-Krylov method.
+    n_jacobian_evals : int
+        Number of Jacobians built by the Gillan method.
+    residuals : np.ndarray, shape=(n_iter,), dtype=float
+        The residual, `rms_normed(oz_map(e_r), e_r)`, of every iteration.
+    step_times : np.ndarray, shape=(n_iter,), dtype=float
+        Wall time of every iteration in seconds.
+    mix_params : np.ndarray, shape=(n_iter,), dtype=float
+        Mixing parameter of the iteration scheme in every iteration, NaN for
+        schemes without one. For Newton-Krylov steps, the step length
+        accepted by the line search.
+
+    """
+    _counts = ('n_iter', 'n_map_evals', 'n_linear_iter', 'n_jacobian_evals')
+
+    def __init__(self):
+        self.converged = False
+        self.reason = None
+        self.n_iter = 0
+        self.n_map_evals = 0
+        self.n_linear_iter = 0
+        self.n_jacobian_evals = 0
+        self._residuals = []
+        self._step_times = []
+        self._mix_params = []
+        self._extra = dict()
+
+    @property
+    def residuals(self):
+        return np.array(self._residuals)
+
+    @property
+    def step_times(self):
+        return np.array(self._step_times)
+
+    @property
+    def mix_params(self):
+        return np.array(self._mix_params, dtype=float)
+
+    def log(self, residual, step_time, mix_param=None):
+        """Append one iteration to the history. """
+        self._residuals.append(residual)
+        self._step_times.append(step_time)
+        self._mix_params.append(np.nan if mix_param is None else mix_param)
+
+    def stop(self, reason):
+        """Record why the iteration stopped. """
+        self.reason = reason
+        self.converged = reason in ('converged', 'cached')
+
+    def stalled(self, window):
+        """Whether the residual made no new low in the last `window` steps. """
+        residuals = self._residuals
+        if len(residuals) <= window:
+            return False
+        return min(residuals[-window:]) >= min(residuals[:-window])
+
+    def extend(self, other):
+        """Append the history of a subsequent solve, e.g. of a later stage.
+
+        Counts and histories are accumulated, the outcome is taken from
+        `other`.
+        """
+        for count in self._counts:
+            setattr(self, count, getattr(self, count) + getattr(other, count))
+        self._residuals.extend(other._residuals)
+        self._step_times.extend(other._step_times)
+        self._mix_params.extend(other._mix_params)
+        self._extra.update(other._extra)
+        self.stop(other.reason)
+
+    def __getitem__(self, key):
+        if key in self._extra:
+            return self._extra[key]
+        if key in self._counts or key == 'converged':
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._counts or key == 'converged':
+            setattr(self, key, value)
+        else:
+            self._extra[key] = value
+
+    def __contains__(self, key):
+        return key in self._counts or key == 'converged' or key in self._extra
+
+    def __repr__(self):
+        return '<ConvergenceRecord; {}; {} iterations>'.format(
+            self.reason, self.n_iter)
+
+
+class BatchRecord(object):
+    """The convergence histories of a stack of solves.
+
+    After `System.solve_batch`, one per state point, is available as
+    `System.solve_info`; after `System.solve_solutes`, one per solute, as
+    `System.solute_info`. Indexing with an integer returns the
+    `ConvergenceRecord` of one solve. Counts and 'converged' may be accessed
+    like dict entries, e.g. `record['n_iter']`, and are arrays with one
+    entry per solve.
+
+    Attributes
+    ----------
+    records : list of ConvergenceRecord
+        The record of every solve.
+    converged : np.ndarray, shape=(n_solves,), dtype=bool
+        Whether each solve converged.
+    reason : np.ndarray, shape=(n_solves,), dtype=str
+        Why the iteration of each solve stopped, see `ConvergenceRecord`.
+    n_iter : np.ndarray, shape=(n_solves,), dtype=int
+        Number of iterations of each solve.
+    n_map_evals : np.ndarray, shape=(n_solves,), dtype=int
+        Number of passes through the closure and the OZ equation of each
+        solve.
+    residuals : list of np.ndarray
+        The residual history of each solve.
+
+    """
+    def __init__(self, records):
+        self.records = list(records)
+
+    @property
+    def converged(self):
+        return np.array([record.converged for record in self.records],
+                        dtype=bool)
+
+    @property
+    def reason(self):
+        return np.array([str(record.reason) for record in self.records])
+
+    @property
+    def n_iter(self):
+        return self._counts('n_iter')
+
+    @property
+    def n_map_evals(self):
+        return self._counts('n_map_evals')
+
+    @property
+    def residuals(self):
+        return [record.residuals for record in self.records]
+
+    def _counts(self, count):
+        return np.array([getattr(record, count) for record in self.records],
+                        dtype=int)
+
+    def extend(self, other):
+        """Append the histories of a subsequent stage of every solve. """
+        for record, other_record in zip(self.records, other.records):
+            record.extend(other_record)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key == 'converged':
+                return self.converged
+            if key in ConvergenceRecord._counts:
+                return self._counts(key)
+            raise KeyError(key)
+        return self.records[key]
+
+    def __contains__(self, key):
+        return key in ConvergenceRecord._counts or key == 'converged'
+
+    def __len__(self):
+        return len(self.records)
+
+    def __repr__(self):
+        return '<BatchRecord; {} of {} converged>'.format(
+            self.converged.sum(), len(self.records))
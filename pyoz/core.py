@@ -1,13 +1,26 @@
 import time
 
 import numpy as np
-from scipy.fftpack import dst, idst
-
+from scipy.interpolate import CubicSpline
 
 import pyoz as oz
+from pyoz.cache import make_cache
 from pyoz.closure import supported_closures
+from pyoz.convergence import BatchRecord, ConvergenceRecord
+from pyoz.engines import supported_methods
 from pyoz.exceptions import PyozError
-from pyoz.misc import rms_normed, solver, picard_iteration
+from pyoz.fft import make_fft_backend
+from pyoz.iteration import supported_iteration_schemes
+from pyoz.misc import picard_iteration, solver
+from pyoz.profiler import Profiler, phase, profile as profile_solves
+from pyoz.transforms import SineTransform
+from pyoz.workspace import Workspace
+
+
+# Grids are not coarsened below this number of points.
+MIN_MULTIGRID_PTS = 128
+# Coarse grids only need to be solved to within their discretization error.
+MULTIGRID_COARSE_TOL = 1e-6
 
 
 class System(object):
@@ -23,6 +36,25 @@ class System(object):
 
         self.dr = kwargs.get('dr') or 0.01
 
+        # Backend for the sine transforms. `None` uses the global default, see
+        # `pyoz.set_fft_backend`.
+        fft_backend = kwargs.get('fft_backend')
+        if fft_backend is not None:
+            fft_backend = make_fft_backend(fft_backend)
+        self.fft_backend = fft_backend
+
+        # Precision of the iteration: 'double', 'single' or 'mixed'. Mixed
+        # precision iterates in single precision until the residual has not
+        # reached a new low for `mixed_precision_window` iterations, or drops
+        # below `mixed_precision_tol`, and then finishes in double precision.
+        # `max_iter` applies to each stage separately.
+        self.precision = kwargs.get('precision') or 'double'
+        if self.precision not in ('double', 'single', 'mixed'):
+            raise PyozError('Unsupported precision: ', self.precision)
+        self.mixed_precision_tol = kwargs.get('mixed_precision_tol') or 1e-5
+        self.mixed_precision_window = (kwargs.get('mixed_precision_window')
+                                       or 10)
+
         max_r = self.dr * self.n_pts
         self.dk = np.pi / max_r
 
@@ -39,6 +71,10 @@ class System(object):
         # Results get stored after `System.solve` successfully completes.
         self.g_r = self.h_r = self.c_r = self.e_r = self.H_k = None
         self.closure_used = None
+        self.solve_info = None
+        self.solute_info = None
+        self.solve_profile = None
+        self._workspaces = dict()
 
     @property
     def n_components(self):
@@ -75,7 +111,10 @@ class System(object):
 
     def solve(self, rhos, closure_name='hnc', initial_e_r=None,
               mix_param=0.8, tol=1e-9, status_updates=False,  max_iter=1000,
-              **kwargs):
+              iteration_scheme='picard', method='fixed-point',
+              method_options=None, linear_solver='lu', multigrid_levels=0,
+              callback=None, profile=False, cache=None, warm_start=None,
+              warm_start_params=None, infinite_dilution=False, **kwargs):
         """Solve the Ornstein-Zernike equation for this system.
 
         Parameters
@@ -95,6 +134,58 @@ class System(object):
             Display convergence information at every iteration.
         max_iter : int
             Maximum number of iterations.
+        iteration_scheme : str or iteration scheme object
+            The scheme used to compute the next input from the last one.
+            Valid names can be viewed via `print(pyoz.iteration_scheme_names)`.
+            Instances such as `pyoz.Anderson(n_history=10)` may be passed to
+            control the scheme's parameters.
+        method : str
+            The algorithm used to find the solution. 'fixed-point' iterates
+            with `iteration_scheme`; 'newton-krylov' performs Jacobian-free
+            Newton-GMRES steps; 'gillan' combines Newton-Raphson steps for
+            the short range part of `e_r` with `iteration_scheme` for the
+            rest. Valid options can be viewed via `print(pyoz.method_names)`.
+        method_options : dict, optional
+            Additional keyword arguments for the solution method, e.g.
+            `inner_maxiter` for 'newton-krylov' or `n_basis` for 'gillan'.
+            See `pyoz.engines`.
+        linear_solver : str, optional, default='lu'
+            How the OZ equation is solved at every point in k-space, 'lu' or
+            'cholesky'. 'cholesky' returns an exactly symmetric `H_k` at all
+            points where the structure factors are positive and falls back
+            to 'lu' elsewhere. See `pyoz.misc.solver`.
+        multigrid_levels : int, optional, default=0
+            Number of successively coarser grids, each with half the points
+            and twice the spacing of the next finer one, to solve on first.
+            The converged `e_r` of every grid is interpolated onto the next
+            finer one as its initial guess. Only used when `initial_e_r` is
+            not given and the closure is not 'RHNC'.
+        callback : callable, optional
+            Called as `callback(record, e_r)` after every iteration, with the
+            `pyoz.ConvergenceRecord` so far and the current indirect
+            correlation function. Returning True stops the solve, which is
+            then treated as unconverged.
+        profile : bool, optional, default=False
+            Record the time spent in every phase of the solve loop in a
+            `pyoz.Profiler`, stored as `self.solve_profile`. Use
+            `pyoz.profile` to aggregate over many solves.
+        cache : pyoz.SolutionCache or str, optional
+            Look up the solution in this cache, or directory, before solving
+            and store it there after converging. Solutions are identified by
+            the potentials, grid, temperature, densities, closure, precision
+            and `tol`.
+        warm_start : pyoz.WarmStartDB, optional
+            If `initial_e_r` is not given, start from the closest state point
+            stored in this database. Converged solutions are added to it.
+        warm_start_params : list-like, optional
+            Parameters of the potentials that, along with the densities and
+            the temperature, identify the state point in `warm_start`.
+        infinite_dilution : bool, optional, default=False
+            Treat components with zero density as solutes at infinite
+            dilution. The other components are solved alone and the solutes
+            are then solved in them, see `solve_solutes`. By default, the
+            correlation functions of zero density pairs are those of an
+            ideal gas, `g_r = exp(-U / kT)`.
 
         Returns
         -------
@@ -107,18 +198,32 @@ class System(object):
         H_k : np.ndarray, shape=(n_comps, n_comps, n_pts), dtype=float
             Total correlation functions in fourier space.
 
+        The `pyoz.ConvergenceRecord` of the last solve, with its residual
+        history and the reason it stopped, is stored in `self.solve_info`.
+        With `precision='single'` the results are single precision arrays.
+
         """
+        if profile:
+            with profile_solves(Profiler()) as profiler:
+                results = self.solve(
+                    rhos, closure_name=closure_name, initial_e_r=initial_e_r,
+                    mix_param=mix_param, tol=tol,
+                    status_updates=status_updates, max_iter=max_iter,
+                    iteration_scheme=iteration_scheme, method=method,
+                    method_options=method_options,
+                    linear_solver=linear_solver,
+                    multigrid_levels=multigrid_levels, callback=callback,
+                    cache=cache, warm_start=warm_start,
+                    warm_start_params=warm_start_params,
+                    infinite_dilution=infinite_dilution, **kwargs)
+            self.solve_profile = profiler
+            return results
+
         # Bring some unchanging variables into the local namespace.
         rhos = self._validate_solve_inputs(rhos)
         rho_ij = self._set_rho_ij(rhos)
 
         U_r = self.U_r
-        n_components = self.n_components
-        n_pts = self.n_pts
-        r = self.r
-        dr = self.dr
-        k = self.k
-        dk = self.dk
 
         # Lookup the closure.
         try:
@@ -126,99 +231,655 @@ class System(object):
         except KeyError:
             raise PyozError('Unsupported closure: ', closure_name)
 
-        # Perform reference system calculation if necessary.
+        # Lookup the iteration scheme.
+        if isinstance(iteration_scheme, str):
+            try:
+                scheme_class = supported_iteration_schemes[
+                    iteration_scheme.lower()]
+            except KeyError:
+                raise PyozError('Unsupported iteration scheme: ',
+                                iteration_scheme)
+            scheme = scheme_class()
+        else:
+            scheme = iteration_scheme
+        scheme.reset(mix_param)
+
+        # Lookup the solution method.
+        try:
+            engine = supported_methods[method.lower()]
+        except KeyError:
+            raise PyozError('Unsupported solution method: ', method)
+
         if closure_name.upper() == 'RHNC':
             if kwargs.get('reference_system') is None:
                 raise PyozError('Missing `reference_system` parameter for RHNC'
                                 ' closure.')
 
+        solvent = np.flatnonzero(np.asarray(rhos, dtype=float) > 0)
+        if infinite_dilution and 0 < solvent.size < self.n_components:
+            if closure_name.upper() == 'RHNC':
+                raise PyozError('The RHNC closure is not supported at '
+                                'infinite dilution.')
+            return self._solve_infinite_dilution(
+                rhos, solvent, closure_name=closure_name,
+                initial_e_r=initial_e_r, mix_param=mix_param, tol=tol,
+                status_updates=status_updates, max_iter=max_iter,
+                iteration_scheme=scheme, method=method,
+                method_options=method_options, linear_solver=linear_solver,
+                multigrid_levels=multigrid_levels, callback=callback,
+                cache=cache, warm_start=warm_start,
+                warm_start_params=warm_start_params, **kwargs)
+
+        cache = make_cache(cache)
+        if cache is not None:
+            cache_key = cache.key(self, rhos, closure_name, tol,
+                                  kwargs.get('reference_system'))
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return self._load_cached(closure, *cached)
+
+        # Perform reference system calculation if necessary. Entries of
+        # `warm_start` do not identify the potential, so the reference is not
+        # stored there, where it would replace the full solution.
+        if closure_name.upper() == 'RHNC':
             ref_system = kwargs['reference_system']
             _, _, initial_e_r, _ = ref_system.solve(rhos=rhos,
                                                     closure_name='HNC',
-                                                    **kwargs)
+                                                    cache=cache, **kwargs)
+
+        warm_start_distance = None
+        if warm_start is not None and initial_e_r is None:
+            initial_e_r, warm_start_distance = warm_start.nearest(
+                self, rhos, warm_start_params)
+
+        coarse_info = None
+        if (multigrid_levels > 0 and initial_e_r is None and
+                closure_name.upper() != 'RHNC'):
+            initial_e_r, coarse_info = self._coarse_initial_e_r(
+                rhos, multigrid_levels, closure_name=closure_name,
+                mix_param=mix_param, tol=tol, status_updates=status_updates,
+                max_iter=max_iter, iteration_scheme=scheme, method=method,
+                method_options=method_options, linear_solver=linear_solver,
+                **kwargs)
 
         self.closure_used = closure
         if initial_e_r is None:
             e_r = np.zeros_like(U_r)
         else:
-            e_r = initial_e_r
+            e_r = np.array(initial_e_r, dtype=float)
 
-        C_k = np.zeros_like(U_r)
-        E = np.zeros_like(U_r)
-        for n in range(n_pts):
-            E[:, :, n] = np.eye(n_components)
+        def make_oz_map(dtype):
+            transform = SineTransform(self.r, self.k, self.dr, self.dk,
+                                      rho_ij, backend=self.fft_backend,
+                                      dtype=dtype)
+            workspace = self._get_workspace(U_r.shape, dtype)
+            U_r_work = U_r.astype(dtype, copy=False)
+
+            def oz_map(e_r, out=None):
+                return self._oz_map(e_r, closure, transform, workspace,
+                                    out=out, linear_solver=linear_solver,
+                                    U_r=U_r_work, **kwargs)
+            return oz_map
 
-        n_iter = 0
         logger = oz.logger
         logger.info('Initialized: {}'.format(self))
-        if status_updates:
-            logger.info('Starting iteration...')
-            logger.info('   {:8s}{:10s}{:10s}'.format(
-                'step', 'time (s)', 'error'))
         start = time.time()
-        while n_iter < max_iter:
-            loop_start = time.time()
-            n_iter += 1
-            e_r_previous = np.copy(e_r)
+        e_r_initial = e_r
+        info = None
+        for dtype, stage_tol, window in self._precision_stages(tol):
+            scheme.reset(mix_param)
+            stage_callback = callback
+            stalled = []
+            if window is not None:
+                def stop_at_plateau(record, e_r):
+                    if callback is not None and callback(record, e_r):
+                        return True
+                    if record.stalled(window):
+                        stalled.append(record.n_iter)
+                        return True
+                    return False
+                stage_callback = stop_at_plateau
+            e_r, H_k, stage_info = engine(make_oz_map(dtype),
+                                          e_r.astype(dtype), tol=stage_tol,
+                                          max_iter=max_iter, scheme=scheme,
+                                          status_updates=status_updates,
+                                          callback=stage_callback,
+                                          **(method_options or {}))
+            if stalled:
+                stage_info.stop('stalled')
+            if info is None:
+                info = stage_info
+            else:
+                info.extend(stage_info)
+            if stage_info.reason == 'callback' or (
+                    dtype == np.float64 and
+                    stage_info.reason in ('diverged', 'unstable')):
+                break
+            if e_r is None or not np.isfinite(e_r).all():
+                # Restart a failed single precision stage from scratch.
+                e_r = e_r_initial
+        end = time.time()
+        if coarse_info is not None:
+            info['coarse'] = coarse_info
+        if warm_start_distance is not None:
+            info['warm_start_distance'] = warm_start_distance
+        self.solve_info = info
+        if not info['converged']:
+            return self.nan_arrays
 
-            # Apply the closure relation.
-            c_r = closure(U_r, e_r, self.kT, **kwargs)
+        c_r = closure(U_r.astype(e_r.dtype, copy=False), e_r, self.kT,
+                      **kwargs)
+        self.c_r = c_r
+        self.g_r = g_r = c_r + e_r + 1
+        self.h_r = g_r - 1
+        self.e_r = e_r
+        self.h_k = H_k
+        if cache is not None:
+            cache.put(cache_key, e_r, c_r, H_k)
+        if warm_start is not None:
+            warm_start.add(self, rhos, e_r, warm_start_params)
 
-            # Take us to fourier space.
-            for i, j in np.ndindex(n_components, n_components):
-                constant = 2 * np.pi * rho_ij[i, j] * dr / k
-                transform = dst(c_r[i, j] * r, type=1)
-                C_k[i, j] = constant * transform
+        logger.info('Converged in {:.2f}s after {} iterations'.format(
+            end-start, info['n_iter'])
+        )
+        return g_r, c_r, e_r, H_k
 
-            # Solve dat equation.
-            A = E - C_k
-            B = C_k
-            H_k = solver(A, B)
-            E_k = H_k - C_k
-
-            # Snap back to reality.
-            for i, j in np.ndindex(n_components, n_components):
-                if rho_ij[i, j] == 0:
-                    e_r[i, j] = np.zeros_like(k)
-                else:
-                    constant = n_pts * dk / 4 / np.pi**2 / (n_pts + 1) / r
-                    constant /= rho_ij[i, j]
-                    transform = idst(E_k[i, j] * k, type=1)
-                    e_r[i, j] = constant * transform
-
-            # Test for convergence.
-            rms_norm = rms_normed(e_r, e_r_previous)
-            if rms_norm < tol:
-                break
+    def _load_cached(self, closure, e_r, c_r, H_k):
+        """Store a solution loaded from a `SolutionCache` as the result. """
+        self.closure_used = closure
+        self.c_r = c_r
+        self.g_r = g_r = c_r + e_r + 1
+        self.h_r = g_r - 1
+        self.e_r = e_r
+        self.h_k = H_k
+        self.solve_info = ConvergenceRecord()
+        self.solve_info.stop('cached')
+        oz.logger.info('Loaded from cache: {}'.format(self))
+        return g_r, c_r, e_r, H_k
 
-            if np.isnan(rms_norm) or np.isinf(rms_norm):
-                logger.info('Diverged at iteration # {}'.format(n_iter))
-                return self.nan_arrays
+    def solve_batch(self, rhos, kT=None, closure_name='hnc',
+                    initial_e_r=None, mix_param=0.8, tol=1e-9, max_iter=1000,
+                    linear_solver='lu', **kwargs):
+        """Solve the Ornstein-Zernike equation for many state points at once.
 
-            # Iterate.
-            e_r = picard_iteration(e_r, e_r_previous, mix_param)
+        All state points are stacked along a leading axis and iterated
+        together with Picard mixing. States drop out of the iteration as soon
+        as they converge or diverge.
 
-            if status_updates:
-                logger.info('   {:<8d}{:<8.2f}{:<8.2e}'.format(
-                    n_iter, time.time() - loop_start, rms_norm)
-                )
+        Parameters
+        ----------
+        rhos : list-like, shape=(n_states,) or (n_states, n_comps)
+            The number densities of each component at every state point.
+        kT : float or list-like, shape=(n_states,), optional
+            The temperature at every state point. Defaults to `self.kT`.
+        closure_name : str
+            The name of the closure to use. Valid options can be viewed via
+            `print(pyoz.closure_names)`. 'RHNC' is not supported.
+        initial_e_r : np.ndarray, shape=(n_states, n_comps, n_comps, n_pts)
+            The initial values to use for the indirect correlation function.
+        mix_param : float
+            Mixing ratio used for Picard iteration.
+        tol : float
+            Convergence tolerance.
+        max_iter : int
+            Maximum number of iterations.
+        linear_solver : str, optional, default='lu'
+            How the OZ equation is solved at every point in k-space, 'lu' or
+            'cholesky'. See `pyoz.misc.solver`.
+
+        The iteration runs in the precision chosen for the system.
+
+        Returns
+        -------
+        g_r : np.ndarray, shape=(n_states, n_comps, n_comps, n_pts)
+            Radial distribution functions for all components.
+        c_r : np.ndarray, shape=(n_states, n_comps, n_comps, n_pts)
+            Direct correlation functions for all components.
+        e_r : np.ndarray, shape=(n_states, n_comps, n_comps, n_pts)
+            Indirect correlation functions for all components.
+        H_k : np.ndarray, shape=(n_states, n_comps, n_comps, n_pts)
+            Total correlation functions in fourier space.
+
+        Unconverged state points are filled with NaN. Unlike `solve`, the
+        results are not stored on the system; a `pyoz.BatchRecord` with the
+        `pyoz.ConvergenceRecord` of every state is stored in
+        `self.solve_info`.
+
+        """
+        rhos = np.array(rhos, dtype=float)
+        if rhos.ndim == 1:
+            rhos = rhos[:, np.newaxis]
+        n_states = rhos.shape[0]
+        for state_rhos in rhos:
+            self._validate_solve_inputs(state_rhos)
+        rho_ij = np.sqrt(rhos[:, :, np.newaxis] * rhos[:, np.newaxis, :])
+
+        if kT is None:
+            kT = self.kT
+        kT = np.broadcast_to(np.array(kT, dtype=float), (n_states,))
+        kT = kT[:, np.newaxis, np.newaxis, np.newaxis]
+
+        try:
+            closure = supported_closures[closure_name.lower()]
+        except KeyError:
+            raise PyozError('Unsupported closure: ', closure_name)
+        if closure_name.upper() == 'RHNC':
+            raise PyozError('The RHNC closure is not supported by '
+                            '`solve_batch`.')
+
+        U_r = self.U_r
+        shape = (n_states,) + U_r.shape
+        if initial_e_r is None:
+            e_r = np.zeros(shape=shape)
         else:
-            logger.info('Exceeded max # of iterations: {}'.format(n_iter))
-            return self.nan_arrays
+            e_r = np.array(initial_e_r, dtype=float)
+            if e_r.shape != shape:
+                raise PyozError('`initial_e_r` must have the shape '
+                                '{}.'.format(shape))
+
+        logger = oz.logger
+        logger.info('Initialized batch of {} states: {}'.format(n_states,
+                                                                self))
+        start = time.time()
+        e_r_initial = e_r
+        info = None
+        for dtype, stage_tol, window in self._precision_stages(tol):
+            e_r_stage = e_r.astype(dtype)
+            H_k = np.full(shape, np.nan, dtype=dtype)
+            converged, stage_info = self._iterate_batch(
+                e_r_stage, H_k, closure, rho_ij, kT, dtype, stage_tol,
+                max_iter, mix_param, linear_solver, stall_window=window,
+                **kwargs)
+            if info is None:
+                info = stage_info
+            else:
+                info.extend(stage_info)
+            # States that fail in single precision restart from scratch.
+            e_r = np.where(converged[:, np.newaxis, np.newaxis, np.newaxis],
+                           e_r_stage, e_r_initial)
         end = time.time()
 
+        e_r = e_r_stage
+        e_r[~converged] = np.nan
+        c_r = closure(U_r.astype(dtype, copy=False), e_r, kT, **kwargs)
+        g_r = c_r + e_r + 1
+        self.solve_info = info
+
+        logger.info('Converged {} of {} states in {:.2f}s after {} '
+                    'iterations'.format(converged.sum(), n_states,
+                                        end - start, info.n_iter.max()))
+        return g_r, c_r, e_r, H_k
+
+    def solve_solutes(self, U_r, closure_name='hnc', initial_e_r=None,
+                      mix_param=0.8, tol=1e-9, max_iter=1000, **kwargs):
+        """Solve the OZ equation for solutes at infinite dilution.
+
+        The last solution of this system is the solvent. It is not changed by
+        solutes at infinite dilution, so only the indirect correlation
+        functions between every solute u and the solvent are iterated,
+
+            E_uv(k) = sum_w C_uw(k) * rho_w * H_wv(k)
+
+        without solving the OZ equation in k-space. All solutes are stacked
+        and iterated together with Picard mixing. Solutes drop out of the
+        iteration as soon as they converge or diverge.
+
+        Parameters
+        ----------
+        U_r : np.ndarray, shape=(n_solutes, n_comps, n_pts) or (n_comps, n_pts)
+            Potentials between every solute and every component of this
+            system.
+        closure_name : str
+            The name of the closure to use. Valid options can be viewed via
+            `print(pyoz.closure_names)`. 'RHNC' is not supported.
+        initial_e_r : np.ndarray, shape=(n_solutes, n_comps, n_pts)
+            The initial values to use for the indirect correlation function.
+        mix_param : float
+            Mixing ratio used for Picard iteration.
+        tol : float
+            Convergence tolerance.
+        max_iter : int
+            Maximum number of iterations.
+
+        Returns
+        -------
+        g_r : np.ndarray, shape=(n_solutes, n_comps, n_pts)
+            Radial distribution functions between solutes and components.
+        c_r : np.ndarray, shape=(n_solutes, n_comps, n_pts)
+            Direct correlation functions.
+        e_r : np.ndarray, shape=(n_solutes, n_comps, n_pts)
+            Indirect correlation functions.
+        H_k : np.ndarray, shape=(n_solutes, n_comps, n_pts)
+            Total correlation functions in fourier space. Unlike those of
+            `solve`, they are not scaled by densities.
+
+        Unconverged solutes are filled with NaN. The results are not stored
+        on the system; a `pyoz.BatchRecord` with the
+        `pyoz.ConvergenceRecord` of every solute is stored in
+        `self.solute_info`.
+
+        """
+        if (self.solve_info is None or getattr(self, 'h_k', None) is None
+                or not np.all(self.solve_info['converged'])):
+            raise PyozError('The solvent has not been solved.')
+        U_r = np.array(U_r, dtype=float)
+        if U_r.ndim == 2:
+            U_r = U_r[np.newaxis]
+        n_solutes, n_components = U_r.shape[0], self.n_components
+        if U_r.shape[1:] != (n_components, self.n_pts):
+            raise PyozError('Solute potentials must have the shape '
+                            '(n_solutes, {}, {}).'.format(n_components,
+                                                          self.n_pts))
+        try:
+            closure = supported_closures[closure_name.lower()]
+        except KeyError:
+            raise PyozError('Unsupported closure: ', closure_name)
+        if closure_name.upper() == 'RHNC':
+            raise PyozError('The RHNC closure is not supported by '
+                            '`solve_solutes`.')
+
+        # rho_w * H_wv of the solvent, from the density scaled H_k.
+        rhos = self.rho_ij.diagonal()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scale = np.where(rhos[np.newaxis, :] > 0,
+                             np.sqrt(rhos[:, np.newaxis]
+                                     / rhos[np.newaxis, :]), 0)
+        rho_H_k = self.h_k.astype(float) * scale[:, :, np.newaxis]
+        transform = SineTransform(self.r, self.k, self.dr, self.dk,
+                                  np.ones((1, 1)), backend=self.fft_backend)
+
+        if initial_e_r is None:
+            e_r = np.zeros_like(U_r)
+        else:
+            e_r = np.array(initial_e_r, dtype=float)
+        H_k = np.full_like(U_r, np.nan)
+
+        logger = oz.logger
+        logger.info('Initialized {} solutes in: {}'.format(n_solutes, self))
+        start = time.time()
+        converged = np.zeros(n_solutes, dtype=bool)
+        info = BatchRecord(ConvergenceRecord() for _ in range(n_solutes))
+        active = np.arange(n_solutes)
+        n_iter = 0
+        while active.size and n_iter < max_iter:
+            loop_start = time.time()
+            n_iter += 1
+            e_r_previous = e_r[active]
+            c_r = closure(U_r[active], e_r_previous, self.kT, **kwargs)
+            C_k = _transform_pairs(transform.forward, c_r)
+            E_k = np.einsum('uwk,wvk->uvk', C_k, rho_H_k)
+            e_r_new = _transform_pairs(transform.inverse, E_k)
+
+            rms_norms = np.sqrt(((e_r_new - e_r_previous)**2).sum(axis=(1, 2))
+                                / self.n_pts * n_components)
+            done = rms_norms < tol
+            failed = ~np.isfinite(rms_norms)
+            running = ~(done | failed)
+
+            _log_iteration(info, active, rms_norms, done, failed,
+                           time.time() - loop_start, mix_param)
+            converged[active[done]] = True
+            e_r[active[done]] = e_r_new[done]
+            H_k[active[done]] = C_k[done] + E_k[done]
+            e_r[active[running]] = picard_iteration(e_r_new[running],
+                                                    e_r_previous[running],
+                                                    mix_param)
+            active = active[running]
+        for n in active:
+            info[n].stop('max_iter')
+        end = time.time()
+
+        e_r[~converged] = np.nan
         c_r = closure(U_r, e_r, self.kT, **kwargs)
+        g_r = c_r + e_r + 1
+        self.solute_info = info
+
+        logger.info('Converged {} of {} solutes in {:.2f}s after {} '
+                    'iterations'.format(converged.sum(), n_solutes,
+                                        end - start, info.n_iter.max()))
+        return g_r, c_r, e_r, H_k
+
+    def _solve_infinite_dilution(self, rhos, solvent, closure_name,
+                                 initial_e_r, mix_param, tol, max_iter,
+                                 **solve_kwargs):
+        """Solve the solvent alone, then the zero density components in it.
+
+        Solute-solute pairs need no iteration: their indirect correlation
+        functions follow from the converged solute-solvent functions.
+        """
+        solutes = np.flatnonzero(np.asarray(rhos, dtype=float) == 0)
+        solvent_pairs = np.ix_(solvent, solvent)
+        solute_pairs = np.ix_(solutes, solutes)
+        cross_pairs = np.ix_(solutes, solvent)
+        if initial_e_r is not None:
+            initial_e_r = np.asarray(initial_e_r, dtype=float)
+
+        subsystem = System(name=self.name, kT=self.kT, n_pts=self.n_pts + 1,
+                           dr=self.dr, fft_backend=self.fft_backend,
+                           precision=self.precision,
+                           mixed_precision_tol=self.mixed_precision_tol,
+                           mixed_precision_window=self.mixed_precision_window)
+        subsystem.U_r = self.U_r[solvent_pairs]
+        subsystem.solve(
+            [rhos[i] for i in solvent], closure_name=closure_name,
+            initial_e_r=(initial_e_r[solvent_pairs]
+                         if initial_e_r is not None else None),
+            mix_param=mix_param, tol=tol, max_iter=max_iter, **solve_kwargs)
+        self.solve_info = info = subsystem.solve_info
+        if not info['converged']:
+            return self.nan_arrays
+
+        g_uv, c_uv, e_uv, H_uv = subsystem.solve_solutes(
+            self.U_r[cross_pairs], closure_name=closure_name,
+            initial_e_r=(initial_e_r[cross_pairs]
+                         if initial_e_r is not None else None),
+            mix_param=mix_param, tol=tol, max_iter=max_iter)
+        solute_info = subsystem.solute_info
+        info['solute_iter'] = solute_info['n_iter'].max()
+        if not solute_info['converged'].all():
+            info.stop('max_iter' if info['solute_iter'] >= max_iter
+                      else 'diverged')
+            return self.nan_arrays
+
+        # E_uu'(k) = sum_w C_uw(k) * rho_w * H_wu'(k)
+        transform = SineTransform(self.r, self.k, self.dr, self.dk,
+                                  np.ones((1, 1)), backend=self.fft_backend)
+        C_uv = _transform_pairs(transform.forward, c_uv)
+        E_uu = np.einsum('uwk,w,xwk->uxk', C_uv, subsystem.rho_ij.diagonal(),
+                         H_uv)
+        e_uu = _transform_pairs(transform.inverse, E_uu)
+
+        closure = subsystem.closure_used
+        e_r = np.empty(self.U_r.shape, dtype=subsystem.e_r.dtype)
+        e_r[solvent_pairs] = subsystem.e_r
+        e_r[cross_pairs] = e_uv
+        e_r[np.ix_(solvent, solutes)] = e_uv.transpose(1, 0, 2)
+        e_r[solute_pairs] = e_uu
+        c_r = closure(self.U_r.astype(e_r.dtype, copy=False), e_r, self.kT)
+        # Densities scale H_k, so that of pairs with a solute vanishes.
+        H_k = np.zeros_like(e_r)
+        H_k[solvent_pairs] = subsystem.h_k
+
+        self.closure_used = closure
         self.c_r = c_r
         self.g_r = g_r = c_r + e_r + 1
         self.h_r = g_r - 1
         self.e_r = e_r
         self.h_k = H_k
-
-        logger.info('Converged in {:.2f}s after {} iterations'.format(
-            end-start, n_iter)
-        )
         return g_r, c_r, e_r, H_k
 
+    def _coarse_initial_e_r(self, rhos, levels, tol, **solve_kwargs):
+        """Solve on a grid with half the points and twice the spacing.
+
+        Returns the converged `e_r` interpolated onto this grid, or None if
+        the grid is too small to coarsen or the coarse solve fails, and the
+        `solve_info` of the coarse system.
+        """
+        n_pts = (self.n_pts + 1) // 2
+        if n_pts < MIN_MULTIGRID_PTS:
+            return None, None
+        coarse = System(name=self.name, kT=self.kT, n_pts=n_pts,
+                        dr=2 * self.dr, fft_backend=self.fft_backend,
+                        precision=self.precision,
+                        mixed_precision_tol=self.mixed_precision_tol,
+                        mixed_precision_window=self.mixed_precision_window)
+        coarse.U_r = np.empty(self.U_r.shape[:-1] + coarse.r.shape)
+        for index in np.ndindex(self.U_r.shape[:-1]):
+            coarse.U_r[index] = np.interp(coarse.r, self.r, self.U_r[index])
+
+        e_r = coarse.solve(rhos, multigrid_levels=levels - 1,
+                           tol=max(tol, MULTIGRID_COARSE_TOL),
+                           **solve_kwargs)[2]
+        if not coarse.solve_info['converged']:
+            return None, coarse.solve_info
+        e_r = CubicSpline(coarse.r, e_r, axis=-1)(self.r)
+        e_r[..., self.r > coarse.r[-1]] = 0
+        return e_r, coarse.solve_info
+
+    def _iterate_batch(self, e_r, H_k, closure, rho_ij, kT, dtype, tol,
+                       max_iter, mix_param, linear_solver, stall_window=None,
+                       **kwargs):
+        """Picard iterate a stack of state points in place.
+
+        Converged states are stored in `e_r` and `H_k`. Returns the per state
+        convergence flags and a `BatchRecord`. If `stall_window` is given,
+        states whose residual has not reached a new low for that many
+        iterations count as converged, with the reason 'stalled'.
+        """
+        n_states = e_r.shape[0]
+        n_components = self.n_components
+        U_r = self.U_r.astype(dtype, copy=False)
+        transform = SineTransform(self.r, self.k, self.dr, self.dk, rho_ij,
+                                  backend=self.fft_backend, dtype=dtype)
+        workspace = self._get_workspace(e_r.shape, dtype)
+
+        converged = np.zeros(n_states, dtype=bool)
+        records = BatchRecord(ConvergenceRecord() for _ in range(n_states))
+        active = np.arange(n_states)
+        best_norms = np.full(n_states, np.inf)
+        n_since_best = np.zeros(n_states, dtype=int)
+        n_iter = 0
+        while active.size and n_iter < max_iter:
+            loop_start = time.time()
+            n_iter += 1
+            e_r_previous = e_r[active]
+            e_r_new, H_k_new = self._oz_map(e_r_previous, closure, transform,
+                                            workspace[:active.size],
+                                            kT[active],
+                                            linear_solver=linear_solver,
+                                            U_r=U_r, **kwargs)
+
+            squared = ((e_r_new - e_r_previous)**2).sum(axis=(1, 2, 3))
+            rms_norms = np.sqrt(squared / self.n_pts * n_components**2)
+            done = rms_norms < tol
+            failed = ~np.isfinite(rms_norms)
+            stalled = np.zeros_like(done)
+            if stall_window is not None:
+                improved = rms_norms < best_norms[active]
+                best_norms[active[improved]] = rms_norms[improved]
+                n_since_best[active] = np.where(improved, 0,
+                                                n_since_best[active] + 1)
+                stalled = ((n_since_best[active] >= stall_window)
+                           & ~(done | failed))
+                done |= stalled
+            running = ~(done | failed)
+
+            _log_iteration(records, active, rms_norms, done, failed,
+                           time.time() - loop_start, mix_param,
+                           stalled=stalled)
+            converged[active[done]] = True
+            e_r[active[done]] = e_r_new[done]
+            H_k[active[done]] = H_k_new[done]
+            e_r[active[running]] = picard_iteration(e_r_new[running],
+                                                    e_r_previous[running],
+                                                    mix_param)
+            if not running.all():
+                transform = transform[running]
+            active = active[running]
+        for n in active:
+            records[n].stop('max_iter')
+        return converged, records
+
+    def _oz_map(self, e_r, closure, transform, workspace, kT=None, out=None,
+                linear_solver='lu', U_r=None, **kwargs):
+        """Perform one pass through the closure and the OZ equation.
+
+        Parameters
+        ----------
+        e_r : np.ndarray, shape=(..., n_comps, n_comps, n_pts), dtype=float
+            The input indirect correlation functions.
+        closure : function
+            The closure relation.
+        transform : pyoz.transforms.SineTransform
+            Fourier transform for the densities being solved for.
+        workspace : pyoz.workspace.Workspace
+            Buffers for intermediate results.
+        kT : float or np.ndarray, shape=(..., 1, 1, 1), dtype=float
+            Temperatures, defaults to `self.kT`.
+        out : tuple of np.ndarray, optional
+            Arrays to write the resulting `e_r` and `H_k` to.
+        linear_solver : str, optional, default='lu'
+            Method used to solve the OZ equation in k-space.
+        U_r : np.ndarray, shape=(n_comps, n_comps, n_pts), optional
+            The potentials in the working precision, defaults to `self.U_r`.
+
+        Returns
+        -------
+        e_r : np.ndarray, shape=(..., n_comps, n_comps, n_pts), dtype=float
+            The resulting indirect correlation functions.
+        H_k : np.ndarray, shape=(..., n_comps, n_comps, n_pts), dtype=float
+            Total correlation functions in fourier space.
+
+        """
+        if kT is None:
+            kT = self.kT
+        if U_r is None:
+            U_r = self.U_r
+        e_r_out, H_k = out if out is not None else (None, None)
+
+        # Apply the closure relation.
+        with phase('closure'):
+            c_r = closure(U_r, e_r, kT, out=workspace.c_r, **kwargs)
+
+        # Take us to fourier space.
+        with phase('forward transform'):
+            C_k = transform.forward(c_r, out=workspace.C_k,
+                                    work=workspace.pairs)
+
+        # Solve dat equation.
+        with phase('k-space solve'):
+            A = np.subtract(workspace.E, C_k, out=workspace.A)
+            B = C_k
+            H_k = solver(A, B, out=H_k, method=linear_solver)
+            E_k = np.subtract(H_k, C_k, out=workspace.C_k)
+
+        # Snap back to reality.
+        with phase('inverse transform'):
+            e_r = transform.inverse(E_k, out=e_r_out, work=workspace.pairs)
+        return e_r, H_k
+
+    def _get_workspace(self, shape, dtype=float):
+        """Return buffers for arrays of the given shape, reusing old ones. """
+        dtype = np.dtype(dtype)
+        workspace = self._workspaces.get(dtype)
+        if workspace is None or not workspace.fits(shape, dtype):
+            workspace = self._workspaces[dtype] = Workspace(shape, dtype)
+        return workspace
+
+    def _precision_stages(self, tol):
+        """Return the dtype and tolerance of every stage of a solve.
+
+        The third entry is the number of iterations without a new lowest
+        residual after which a stage ends, or None to iterate until `tol`.
+        """
+        if self.precision == 'single':
+            return [(np.float32, tol, None)]
+        if self.precision == 'mixed':
+            return [(np.float32, max(tol, self.mixed_precision_tol),
+                     self.mixed_precision_window),
+                    (np.float64, tol, None)]
+        return [(np.float64, tol, None)]
+
     @property
     def nan_arrays(self):
         """Used as return value for `solve` when unconverged. """
@@ -255,3 +916,26 @@ class System(object):
                 descr.append(' {:.6g}'.format(rho))
         descr.append('>')
         return ''.join(descr)
+
+
+def _log_iteration(info, active, rms_norms, done, failed, step_time,
+                   mix_param, stalled=None):
+    """Log one iteration of a stack of solves into their `BatchRecord`. """
+    for n, rms_norm, is_done, is_failed in zip(active, rms_norms, done,
+                                               failed):
+        record = info[n]
+        record.n_iter = record.n_map_evals = record.n_iter + 1
+        record.log(rms_norm, step_time, mix_param)
+        if is_failed:
+            record.stop('diverged')
+        elif is_done:
+            record.stop('converged')
+    if stalled is not None:
+        for n in active[stalled]:
+            info[n].stop('stalled')
+
+
+def _transform_pairs(transform, f):
+    """Apply an unscaled transform to a stack of pair functions. """
+    n_pts = f.shape[-1]
+    return transform(f.reshape((-1, 1, 1, n_pts))).reshape(f.shape)
@@ -0,0 +1,361 @@
+"""Algorithms that find the fixed point of the closure + OZ equation map.
+
+Every engine is called as `engine(oz_map, e_r, tol, max_iter, scheme,
+status_updates, callback, **options)` where `oz_map(e_r)` returns the
+indirect correlation functions resulting from one pass through the closure
+and the OZ equation along with the corresponding `H_k`. Engines return the
+converged `e_r`, its `H_k` and a `ConvergenceRecord`.
+
+If given, `callback(record, e_r)` is called after every iteration with the
+record so far and the current output of `oz_map`. Returning True stops the
+iteration.
+"""
+import time
+
+import numpy as np
+from scipy.sparse.linalg import LinearOperator, lgmres
+
+import pyoz as oz
+from pyoz.convergence import ConvergenceRecord
+from pyoz.exceptions import PyozError
+from pyoz.misc import rms_normed
+from pyoz.profiler import phase
+
+
+def fixed_point(oz_map, e_r, tol, max_iter, scheme, status_updates=False,
+                callback=None):
+    """Iterate `e_r = scheme(oz_map(e_r), e_r)` until self-consistent.
+
+    The outputs of `oz_map` are written to buffers that are allocated once
+    and the scheme may update its input in place.
+    """
+    logger = oz.logger
+    info = ConvergenceRecord()
+    e_r_buffer = np.empty_like(e_r)
+    H_k = np.empty_like(e_r)
+    difference = np.empty_like(e_r)
+    if status_updates:
+        logger.info('Starting iteration...')
+        logger.info('   {:8s}{:10s}{:10s}'.format(
+            'step', 'time (s)', 'error'))
+    n_iter = 0
+    while n_iter < max_iter:
+        loop_start = time.time()
+        n_iter += 1
+        info.n_iter = info.n_map_evals = n_iter
+        e_r_previous = e_r
+
+        e_r, H_k = oz_map(e_r_previous, out=(e_r_buffer, H_k))
+
+        # Test for convergence.
+        with phase('convergence test'):
+            rms_norm = rms_normed(e_r, e_r_previous, out=difference)
+        info.log(rms_norm, time.time() - loop_start,
+                 getattr(scheme, 'mix', None))
+        if rms_norm < tol:
+            info.stop('converged')
+            break
+        if callback is not None and callback(info, e_r):
+            info.stop('callback')
+            break
+
+        if np.isnan(rms_norm) or np.isinf(rms_norm):
+            e_r = scheme.recover()
+            if e_r is None:
+                logger.info('Diverged at iteration # {}'.format(n_iter))
+                info.stop('diverged')
+                break
+            logger.info('Recovered from divergence at iteration # {}'.format(
+                n_iter))
+            continue
+
+        # Iterate.
+        with phase('mixing'):
+            e_r = scheme(e_r, e_r_previous, rms_norm)
+        if e_r is e_r_buffer:
+            e_r_buffer = e_r_previous
+
+        if status_updates:
+            logger.info('   {:<8d}{:<8.2f}{:<8.2e}'.format(
+                n_iter, time.time() - loop_start, rms_norm)
+            )
+    else:
+        logger.info('Exceeded max # of iterations: {}'.format(n_iter))
+        info.stop('max_iter')
+    return e_r, H_k, info
+
+
+def newton_krylov(oz_map, e_r, tol, max_iter, scheme,
+                  status_updates=False, callback=None, inner_maxiter=30,
+                  outer_k=10, max_backtracks=8):
+    """Solve `oz_map(e_r) - e_r = 0` with Jacobian-free Newton-GMRES.
+
+    Jacobian-vector products are approximated by finite differences of the
+    residual. The linear systems are solved with LGMRES, which carries the
+    most useful search directions of previous Newton steps over into the
+    next one. Steps are shortened by backtracking whenever they fail to
+    decrease the residual or make a structure factor negative. Until the
+    structure factors of the initial guess are positive, `scheme` is used
+    to iterate instead.
+
+    Parameters
+    ----------
+    inner_maxiter : int, optional, default=30
+        Maximum Krylov subspace size per linear solve.
+    outer_k : int, optional, default=10
+        Number of search directions carried over between Newton steps.
+    max_backtracks : int, optional, default=8
+        Maximum number of step halvings per Newton step.
+
+    References
+    ----------
+    .. [1] D. A. Knoll and D. E. Keyes, J. Comput. Phys. 193, 357 (2004)
+    .. [2] A. H. Baker, E. R. Jessup and T. Manteuffel, SIAM J. Matrix Anal.
+           Appl. 26, 962 (2005)
+
+    """
+    logger = oz.logger
+    shape = e_r.shape
+    info = ConvergenceRecord()
+
+    def residual(x):
+        info.n_map_evals += 1
+        e_r_new, H_k = oz_map(x.reshape(shape))
+        return e_r_new.ravel() - x, e_r_new, H_k
+
+    def rms(f):
+        norm = rms_normed(f.reshape(shape), 0)
+        return norm if np.isfinite(norm) else np.inf
+
+    # Newton steps taken from a state with negative structure factors tend to
+    # land on unphysical solutions, so iterate with `scheme` until the
+    # structure factors are positive.
+    loop_start = time.time()
+    x = e_r.ravel().copy()
+    f, e_r, H_k = residual(x)
+    norm = rms(f)
+    info.log(norm, time.time() - loop_start, getattr(scheme, 'mix', None))
+    while not _is_stable(H_k) and np.isfinite(norm):
+        if info.n_map_evals >= max_iter:
+            logger.info('Unable to reach a stable starting point for Newton '
+                        'iteration.')
+            info.stop('unstable')
+            return e_r, H_k, info
+        if callback is not None and callback(info, e_r):
+            info.stop('callback')
+            return e_r, H_k, info
+        loop_start = time.time()
+        x = scheme(e_r, x.reshape(shape)).ravel()
+        f, e_r, H_k = residual(x)
+        norm = rms(f)
+        info.log(norm, time.time() - loop_start, getattr(scheme, 'mix', None))
+    outer_v = []
+    sqrt_eps = np.sqrt(np.finfo(e_r.dtype).eps)
+
+    if status_updates:
+        logger.info('Starting Newton-Krylov iteration...')
+        logger.info('   {:8s}{:10s}{:10s}{:10s}'.format(
+            'step', 'time (s)', 'error', 'linear'))
+    while norm >= tol:
+        if not np.isfinite(norm):
+            logger.info('Diverged at Newton iteration # {}'.format(
+                info.n_iter))
+            info.stop('diverged')
+            return e_r, H_k, info
+        if info.n_iter >= max_iter:
+            logger.info('Exceeded max # of Newton iterations: {}'.format(
+                info.n_iter))
+            info.stop('max_iter')
+            return e_r, H_k, info
+        if callback is not None and callback(info, e_r):
+            info.stop('callback')
+            return e_r, H_k, info
+        loop_start = time.time()
+        info.n_iter += 1
+
+        step = sqrt_eps * (1 + np.linalg.norm(x))
+
+        def jacobian_vector_product(v):
+            info.n_linear_iter += 1
+            v_norm = np.linalg.norm(v)
+            if v_norm == 0:
+                return np.zeros_like(v)
+            h = step / v_norm
+            return (residual(x + h * v)[0] - f) / h
+
+        J = LinearOperator((x.size, x.size), matvec=jacobian_vector_product,
+                           dtype=float)
+        forcing = min(0.1, norm)
+        with phase('krylov solve'):
+            dx, _ = lgmres(J, -f, atol=forcing * np.linalg.norm(f),
+                           maxiter=1, inner_m=inner_maxiter, outer_k=outer_k,
+                           outer_v=outer_v, store_outer_Av=False,
+                           prepend_outer_v=True)
+
+        # Backtrack until the residual decreases without crossing the
+        # singularity of the OZ equation.
+        lam = 1.0
+        for _ in range(max_backtracks + 1):
+            x_trial = x + lam * dx
+            f_trial, e_r_trial, H_k_trial = residual(x_trial)
+            norm_trial = rms(f_trial)
+            if (norm_trial < (1 - 1e-4 * lam) * norm and
+                    _is_stable(H_k_trial)):
+                break
+            lam /= 2
+        else:
+            logger.info('Line search failed at Newton iteration # '
+                        '{}'.format(info.n_iter))
+            info.stop('line_search')
+            return e_r, H_k, info
+        x, f, norm = x_trial, f_trial, norm_trial
+        e_r, H_k = e_r_trial, H_k_trial
+        info.log(norm, time.time() - loop_start, lam)
+
+        if status_updates:
+            logger.info('   {:<8d}{:<8.2f}{:<10.2e}{:<8d}'.format(
+                info.n_iter, time.time() - loop_start, norm,
+                info.n_linear_iter)
+            )
+    info.stop('converged')
+    return e_r, H_k, info
+
+
+def gillan(oz_map, e_r, tol, max_iter, scheme, status_updates=False,
+           callback=None, n_basis=20, node_spacing=8, jacobian_update=0.5):
+    """Solve with Gillan's hybrid Newton-Raphson/Picard scheme.
+
+    Each pair of `e_r` is split into its projection onto `n_basis` roof
+    functions covering the short range region and the remainder. The
+    coefficients of the roof functions are updated by Newton-Raphson steps
+    and the remainder by `scheme`. The Jacobian of the coarse part is built
+    from finite differences and only recomputed when the residual fails to
+    shrink by a factor of `jacobian_update`. Newton steps that increase the
+    residual are discarded in favour of a plain `scheme` step.
+
+    Parameters
+    ----------
+    n_basis : int, optional, default=20
+        Number of roof functions per pair.
+    node_spacing : int, optional, default=8
+        Number of grid points between the nodes of neighbouring roof
+        functions.
+    jacobian_update : float, optional, default=0.5
+        Recompute the Jacobian when the residual of an iteration is larger
+        than this fraction of the previous residual.
+
+    References
+    ----------
+    .. [1] M. J. Gillan, Mol. Phys. 38, 1781 (1979)
+    .. [2] S. Labik, A. Malijevsky and P. Vonka, Mol. Phys. 56, 709 (1985)
+
+    """
+    logger = oz.logger
+    n_components, _, n_pts = e_r.shape
+    dtype = e_r.dtype
+    info = ConvergenceRecord()
+    if n_basis * node_spacing >= n_pts:
+        raise PyozError('Roof functions extend beyond the grid. Reduce '
+                        '`n_basis` or `node_spacing`.')
+
+    # Orthonormal basis spanning the roof functions.
+    nodes = np.arange(n_basis) * node_spacing
+    distance = np.abs(np.arange(n_pts)[:, np.newaxis] - nodes) / node_spacing
+    basis, _ = np.linalg.qr(np.clip(1 - distance, 0, None))
+    pairs = np.triu_indices(n_components)
+    n_coarse = len(pairs[0]) * n_basis
+
+    def coarse(e_r):
+        return np.dot(e_r[pairs], basis).ravel()
+
+    def project(a):
+        e_r = np.zeros(shape=(n_components, n_components, n_pts),
+                       dtype=dtype)
+        e_r[pairs] = np.dot(a.reshape(-1, n_basis), basis.T)
+        e_r[pairs[1], pairs[0]] = e_r[pairs]
+        return e_r
+
+    def evaluate(x):
+        info.n_map_evals += 1
+        return oz_map(x)
+
+    loop_start = time.time()
+    x = e_r
+    e_r, H_k = evaluate(x)
+    jacobian = None
+    previous_norm = np.inf
+    if status_updates:
+        logger.info('Starting Gillan iteration...')
+        logger.info('   {:8s}{:10s}{:10s}'.format(
+            'step', 'time (s)', 'error'))
+    while True:
+        rms_norm = rms_normed(e_r, x)
+        info.log(rms_norm, time.time() - loop_start,
+                 getattr(scheme, 'mix', None))
+        if rms_norm < tol:
+            info.stop('converged')
+            return e_r, H_k, info
+        if np.isnan(rms_norm) or np.isinf(rms_norm):
+            logger.info('Diverged at iteration # {}'.format(info.n_iter))
+            info.stop('diverged')
+            return e_r, H_k, info
+        if info.n_iter >= max_iter:
+            break
+        if callback is not None and callback(info, e_r):
+            info.stop('callback')
+            return e_r, H_k, info
+        loop_start = time.time()
+        info.n_iter += 1
+
+        # Newton-Raphson step for the coefficients of the roof functions.
+        a_x, a_e = coarse(x), coarse(e_r)
+        if jacobian is None or rms_norm > jacobian_update * previous_norm:
+            jacobian = -np.eye(n_coarse)
+            step = np.sqrt(np.finfo(x.dtype).eps) * (1 + np.abs(a_x).max())
+            for m in range(n_coarse):
+                perturbation = np.zeros(n_coarse)
+                perturbation[m] = step
+                e_r_perturbed, _ = evaluate(x + project(perturbation))
+                jacobian[:, m] += (coarse(e_r_perturbed) - a_e) / step
+            info.n_jacobian_evals += 1
+        try:
+            da = np.linalg.solve(jacobian, a_x - a_e)
+        except np.linalg.LinAlgError:
+            da = a_e - a_x
+        previous_norm = rms_norm
+
+        # Iterate the remainder. Fall back to `scheme` alone and refresh the
+        # Jacobian if the Newton step increases the residual.
+        x_next = scheme(e_r, x, rms_norm)
+        x = x_next - project(coarse(x_next)) + project(a_x + da)
+        e_r, H_k = evaluate(x)
+        if not rms_normed(e_r, x) < rms_norm:
+            x = x_next
+            e_r, H_k = evaluate(x)
+            jacobian = None
+
+        if status_updates:
+            logger.info('   {:<8d}{:<8.2f}{:<8.2e}'.format(
+                info.n_iter, time.time() - loop_start, rms_norm)
+            )
+    logger.info('Exceeded max # of iterations: {}'.format(info.n_iter))
+    info.stop('max_iter')
+    return e_r, H_k, info
+
+
+def _is_stable(H_k):
+    """Check that the matrix of structure factors is positive definite. """
+    S_k = np.moveaxis(H_k, -1, 0) + np.eye(H_k.shape[0])
+    return np.linalg.eigvalsh(S_k).min() > 0
+
+
+supported_methods = {'fixed-point': fixed_point,
+
+                     'newton-krylov': newton_krylov,
+                     'jfnk': newton_krylov,
+                     'nk': newton_krylov,
+
+                     'gillan': gillan,
+                     'lmv': gillan,
+                     'labik-malijevsky-vonka': gillan}
+method_names = supported_methods.keys()
@@ -0,0 +1,180 @@
+"""Backends for the discrete sine transforms used by the solver.
+
+Every backend computes the unnormalized type I discrete sine transform along
+the last axis,
+
+    y_k = 2 * sum_j x_j * sin(pi * (j + 1) * (k + 1) / (n + 1))
+
+which, up to a factor of 2 * (n + 1), is its own inverse.
+
+The backend used by a `System` is chosen with its `fft_backend` argument.
+Systems that do not specify one use the global default, which can be changed
+with `set_fft_backend`:
+
+    >>> import pyoz as oz
+    >>> oz.set_fft_backend('scipy', workers=32)
+    >>> lj = oz.System(fft_backend=oz.NumpyBackend())
+
+"""
+import os
+
+import numpy as np
+
+from pyoz.exceptions import PyozError
+
+try:
+    import scipy.fft as _scipy_fft
+except ImportError:
+    _scipy_fft = None
+from scipy import fftpack as _fftpack
+
+try:
+    import pyfftw
+except ImportError:
+    pyfftw = None
+
+
+__all__ = ['ScipyBackend', 'FFTWBackend', 'NumpyBackend', 'set_fft_backend',
+           'get_fft_backend']
+
+
+class ScipyBackend(object):
+    """Sine transforms from `scipy.fft`.
+
+    Falls back to the single threaded `scipy.fftpack` for SciPy < 1.4.
+
+    Parameters
+    ----------
+    workers : int, optional
+        Number of threads used for each transform. Negative values count
+        back from the number of CPUs, e.g. -1 uses all of them.
+
+    """
+    def __init__(self, workers=None):
+        self.workers = workers
+
+    def dst(self, x, overwrite_x=False):
+        """Type I discrete sine transform along the last axis. """
+        if _scipy_fft is None:
+            return _fftpack.dst(x, type=1, axis=-1, overwrite_x=overwrite_x)
+        return _scipy_fft.dst(x, type=1, axis=-1, overwrite_x=overwrite_x,
+                              workers=self.workers)
+
+    def __repr__(self):
+        return '<ScipyBackend; workers: {}>'.format(self.workers)
+
+
+class FFTWBackend(object):
+    """Sine transforms from FFTW, through pyFFTW.
+
+    A plan is created for every array shape and dtype on first use and kept
+    for all later transforms of that shape.
+
+    Parameters
+    ----------
+    threads : int, optional, default=os.cpu_count()
+        Number of threads used for each transform.
+    planner_effort : str, optional, default='FFTW_MEASURE'
+        How much time FFTW spends looking for a fast plan, one of
+        'FFTW_ESTIMATE', 'FFTW_MEASURE', 'FFTW_PATIENT' or 'FFTW_EXHAUSTIVE'.
+    wisdom : tuple, optional
+        Wisdom from a previous session, as returned by `export_wisdom`.
+
+    """
+    def __init__(self, threads=None, planner_effort='FFTW_MEASURE',
+                 wisdom=None):
+        if pyfftw is None:
+            raise PyozError('The FFTW backend requires `pyfftw`:\n\n'
+                            '"conda install -c conda-forge pyfftw"\n\n')
+        self.threads = threads or os.cpu_count() or 1
+        self.planner_effort = planner_effort
+        self._plans = dict()
+        if wisdom is not None:
+            pyfftw.import_wisdom(wisdom)
+
+    def dst(self, x, overwrite_x=False):
+        """Type I discrete sine transform along the last axis. """
+        key = (x.shape, x.dtype)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = pyfftw.FFTW(pyfftw.empty_aligned(x.shape, dtype=x.dtype),
+                               pyfftw.empty_aligned(x.shape, dtype=x.dtype),
+                               axes=(-1,), direction=['FFTW_RODFT00'],
+                               flags=(self.planner_effort,),
+                               threads=self.threads)
+            self._plans[key] = plan
+        plan.input_array[...] = x
+        plan()
+        if overwrite_x:
+            x[...] = plan.output_array
+            return x
+        return plan.output_array.copy()
+
+    @staticmethod
+    def export_wisdom():
+        """Return the accumulated FFTW wisdom for reuse in a later session. """
+        return pyfftw.export_wisdom()
+
+    def __repr__(self):
+        return '<FFTWBackend; threads: {}>'.format(self.threads)
+
+
+class NumpyBackend(object):
+    """Sine transforms computed from a real FFT with `numpy.fft`. """
+    def dst(self, x, overwrite_x=False):
+        """Type I discrete sine transform along the last axis. """
+        n_pts = x.shape[-1]
+        odd = np.zeros(x.shape[:-1] + (2 * (n_pts + 1),), dtype=x.dtype)
+        odd[..., 1:n_pts + 1] = x
+        odd[..., n_pts + 2:] = -x[..., ::-1]
+        transform = -np.fft.rfft(odd, axis=-1).imag[..., 1:n_pts + 1]
+        transform = transform.astype(x.dtype, copy=False)
+        if overwrite_x:
+            x[...] = transform
+            return x
+        return transform
+
+    def __repr__(self):
+        return '<NumpyBackend>'
+
+
+supported_fft_backends = {'scipy': ScipyBackend,
+                          'fftw': FFTWBackend,
+                          'pyfftw': FFTWBackend,
+                          'numpy': NumpyBackend}
+fft_backend_names = supported_fft_backends.keys()
+
+_default_backend = ScipyBackend()
+
+
+def make_fft_backend(backend, **options):
+    """Return a backend instance from a name or an existing instance. """
+    if not isinstance(backend, str):
+        return backend
+    try:
+        backend_class = supported_fft_backends[backend.lower()]
+    except KeyError:
+        raise PyozError('Unsupported FFT backend: ', backend)
+    return backend_class(**options)
+
+
+def set_fft_backend(backend, **options):
+    """Set the backend used by systems that do not specify their own.
+
+    Parameters
+    ----------
+    backend : str or backend object
+        The name of the backend or a backend instance. Valid names can be
+        viewed via `print(pyoz.fft_backend_names)`.
+    **options
+        Passed on to the backend, e.g. `workers` for 'scipy' or `threads`
+        for 'fftw'.
+
+    """
+    global _default_backend
+    _default_backend = make_fft_backend(backend, **options)
+
+
+def get_fft_backend():
+    """Return the backend used by systems that do not specify their own. """
+    return _default_backend
@@ -0,0 +1,250 @@
+from collections import deque
+
+import numpy as np
+
+from pyoz.exceptions import PyozError
+from pyoz.misc import picard_iteration, rms_normed
+
+
+__all__ = ['Picard', 'AdaptivePicard', 'Anderson', 'Ng']
+
+
+class Picard(object):
+    """Plain Picard mixing of the old and new indirect correlation functions.
+
+    e_r_new = (1 - mix) * e_r_previous + mix * e_r
+
+    Parameters
+    ----------
+    mix_param : float, optional
+        Mixing ratio. If not provided, the `mix_param` passed to
+        `System.solve` is used.
+
+    """
+    def __init__(self, mix_param=None):
+        self.mix_param = mix_param
+        self.mix = mix_param
+
+    def reset(self, mix_param):
+        """Prepare the scheme for a new solve. """
+        self.mix = self.mix_param if self.mix_param is not None else mix_param
+
+    def __call__(self, e_r, e_r_previous, rms_norm=None):
+        """Compute the next input from the current input and its image.
+
+        Parameters
+        ----------
+        e_r : np.ndarray, shape=(n_comps, n_comps, n_pts), dtype=float
+            The indirect correlation function produced by the last iteration.
+        e_r_previous : np.ndarray, shape=(n_comps, n_comps, n_pts), dtype=float
+            The indirect correlation function that was fed into it.
+        rms_norm : float, optional
+            `rms_normed(e_r, e_r_previous)`, if already computed.
+
+        Returns
+        -------
+        e_r_next : np.ndarray, shape=(n_comps, n_comps, n_pts), dtype=float
+            The indirect correlation function to feed into the next iteration.
+            Schemes may write it to `e_r_previous` but not to `e_r`.
+
+        """
+        return picard_iteration(e_r, e_r_previous, self.mix, out=e_r_previous)
+
+    def recover(self):
+        """Return a new input after the iteration diverged.
+
+        Returns None if the scheme cannot recover, in which case the solve is
+        abandoned.
+        """
+        return None
+
+
+class AdaptivePicard(Picard):
+    """Picard mixing with an adaptive mixing ratio and rollback.
+
+    The mixing ratio grows by a factor `grow` after every iteration that
+    decreases the residual and shrinks by a factor `shrink` after every
+    iteration that increases it. When the residual exceeds `rollback` times
+    the lowest residual seen so far or becomes non-finite, the iteration
+    restarts from the input that produced the lowest residual.
+
+    Parameters
+    ----------
+    mix_param : float, optional
+        Initial mixing ratio. If not provided, the `mix_param` passed to
+        `System.solve` is used.
+    grow : float, optional, default=1.1
+        Factor by which the mixing ratio grows after a successful iteration.
+    shrink : float, optional, default=0.7
+        Factor by which the mixing ratio shrinks after a failed iteration.
+    rollback : float, optional, default=10
+        Residual, relative to the lowest one seen so far, above which the
+        iteration restarts from the best input.
+    min_mix : float, optional, default=1e-3
+        Lower bound for the mixing ratio.
+    max_mix : float, optional, default=1.0
+        Upper bound for the mixing ratio.
+    max_recoveries : int, optional, default=20
+        Maximum number of restarts from the best input before giving up.
+
+    """
+    def __init__(self, mix_param=None, grow=1.1, shrink=0.7, rollback=10,
+                 min_mix=1e-3, max_mix=1.0, max_recoveries=20):
+        super(AdaptivePicard, self).__init__(mix_param=mix_param)
+        self.grow = grow
+        self.shrink = shrink
+        self.rollback = rollback
+        self.min_mix = min_mix
+        self.max_mix = max_mix
+        self.max_recoveries = max_recoveries
+        self.n_recoveries = 0
+        self._best = None
+        self._best_norm = self._last_norm = np.inf
+
+    def reset(self, mix_param):
+        super(AdaptivePicard, self).reset(mix_param)
+        self.n_recoveries = 0
+        self._best_norm = self._last_norm = np.inf
+
+    def __call__(self, e_r, e_r_previous, rms_norm=None):
+        if rms_norm is None:
+            rms_norm = rms_normed(e_r, e_r_previous)
+        if rms_norm > self.rollback * self._best_norm:
+            e_r_next = self.recover()
+            if e_r_next is not None:
+                return e_r_next
+
+        if rms_norm < self._best_norm:
+            # The buffers holding the best state are allocated once and reused.
+            if (self._best is None or self._best[0].shape != e_r.shape or
+                    self._best[0].dtype != e_r.dtype):
+                self._best = (np.empty_like(e_r), np.empty_like(e_r))
+            np.copyto(self._best[0], e_r)
+            np.copyto(self._best[1], e_r_previous)
+            self._best_norm = rms_norm
+        if rms_norm < self._last_norm:
+            self.mix = min(self.mix * self.grow, self.max_mix)
+        else:
+            self.mix = max(self.mix * self.shrink, self.min_mix)
+        self._last_norm = rms_norm
+        return picard_iteration(e_r, e_r_previous, self.mix, out=e_r_previous)
+
+    def recover(self):
+        if (np.isinf(self._best_norm) or
+                self.n_recoveries >= self.max_recoveries):
+            return None
+        self.n_recoveries += 1
+        self.mix = max(self.mix * self.shrink, self.min_mix)
+        self._last_norm = self._best_norm
+        return picard_iteration(self._best[0], self._best[1], self.mix)
+
+
+class Anderson(Picard):
+    """Anderson mixing, also known as direct inversion in the iterative
+    subspace (DIIS).
+
+    The next input is the Picard-mixed combination of the last `n_history`
+    inputs whose residuals, e_r - e_r_previous, have the smallest norm.
+
+    Parameters
+    ----------
+    n_history : int, optional, default=5
+        Number of previous iterations used to build the extrapolation.
+    mix_param : float, optional
+        Mixing ratio applied to the extrapolated residual. If not provided,
+        the `mix_param` passed to `System.solve` is used.
+
+    References
+    ----------
+    .. [1] D. G. Anderson, J. ACM 12, 547 (1965)
+    .. [2] H. F. Walker and P. Ni, SIAM J. Numer. Anal. 49, 1715 (2011)
+
+    """
+    def __init__(self, n_history=5, mix_param=None):
+        if n_history < 1:
+            raise PyozError('Anderson mixing requires `n_history` >= 1.')
+        super(Anderson, self).__init__(mix_param=mix_param)
+        self.n_history = n_history
+        self._inputs = deque(maxlen=n_history + 1)
+        self._residuals = deque(maxlen=n_history + 1)
+
+    def reset(self, mix_param):
+        super(Anderson, self).reset(mix_param)
+        self._inputs.clear()
+        self._residuals.clear()
+
+    def __call__(self, e_r, e_r_previous, rms_norm=None):
+        x = e_r_previous.ravel()
+        f = e_r.ravel() - x
+        self._inputs.append(x.copy())
+        self._residuals.append(f)
+        if len(self._inputs) == 1:
+            return picard_iteration(e_r, e_r_previous, self.mix)
+
+        inputs = np.array(self._inputs)
+        residuals = np.array(self._residuals)
+        dX = np.diff(inputs, axis=0).T
+        dF = np.diff(residuals, axis=0).T
+        gamma = np.linalg.lstsq(dF, f, rcond=None)[0]
+
+        x_next = x + self.mix * f - np.dot(dX + self.mix * dF, gamma)
+        return x_next.reshape(e_r.shape)
+
+
+class Ng(Picard):
+    """Ng's three-point acceleration scheme.
+
+    The next input is the combination of the last three outputs whose
+    residuals, e_r - e_r_previous, have the smallest norm. Plain Picard
+    mixing is used until three iterations are available.
+
+    Parameters
+    ----------
+    mix_param : float, optional
+        Mixing ratio used for the initial Picard iterations. If not provided,
+        the `mix_param` passed to `System.solve` is used.
+
+    References
+    ----------
+    .. [1] K.-C. Ng, J. Chem. Phys. 61, 2680 (1974)
+
+    """
+    def __init__(self, mix_param=None):
+        super(Ng, self).__init__(mix_param=mix_param)
+        self._outputs = deque(maxlen=3)
+        self._residuals = deque(maxlen=3)
+
+    def reset(self, mix_param):
+        super(Ng, self).reset(mix_param)
+        self._outputs.clear()
+        self._residuals.clear()
+
+    def __call__(self, e_r, e_r_previous, rms_norm=None):
+        self._outputs.append(e_r.copy())
+        self._residuals.append(e_r - e_r_previous)
+        if len(self._outputs) < 3:
+            return picard_iteration(e_r, e_r_previous, self.mix)
+
+        d_n, d_n1, d_n2 = (self._residuals[2], self._residuals[1],
+                           self._residuals[0])
+        d01 = d_n - d_n1
+        d02 = d_n - d_n2
+        A = np.array([[np.vdot(d01, d01), np.vdot(d01, d02)],
+                      [np.vdot(d02, d01), np.vdot(d02, d02)]])
+        b = np.array([np.vdot(d_n, d01), np.vdot(d_n, d02)])
+        try:
+            c1, c2 = np.linalg.solve(A, b)
+        except np.linalg.LinAlgError:
+            return picard_iteration(e_r, e_r_previous, self.mix)
+
+        g_n, g_n1, g_n2 = self._outputs[2], self._outputs[1], self._outputs[0]
+        return (1 - c1 - c2) * g_n + c1 * g_n1 + c2 * g_n2
+
+
+supported_iteration_schemes = {'picard': Picard,
+                               'adaptive': AdaptivePicard,
+                               'adaptive picard': AdaptivePicard,
+                               'anderson': Anderson,
+                               'diis': Anderson,
+                               'ng': Ng}
+iteration_scheme_names = supported_iteration_schemes.keys()
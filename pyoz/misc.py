@@ -1,66 +1,144 @@
-import warnings
-
-try:
-    from numba import jit
-except ImportError:
-    def jit(*args, **kwargs):
-        """Dummy decorator that does nothing. """
-        def true_decorator(f):
-            return f
-        return true_decorator
-    warnings.warn('Unable to import `numba`. Installing `numba` will '
-                  'significantly accelerate your code:\n\n'
-                  '"conda install numba"\n\n')
+import os
+import tempfile
+
 import numpy as np
 
 from pyoz.exceptions import PyozError
 
 
-def rms_normed(A, B):
+def rms_normed(A, B, out=None):
     """Compute the squared and normed distance between two arrays.
 
     distance = sqrt(sum[(A - B)^2] / (n_pts * n_components^2))
+
+    If given, `out` is used as scratch space for A - B.
     """
-    distance = ((A - B)**2).sum() / A.shape[2] * A.shape[0]**2
+    difference = np.subtract(A, B, out=out)
+    distance = np.vdot(difference, difference) / A.shape[2] * A.shape[0]**2
     return np.sqrt(distance)
 
 
-@jit(nopython=True)
-def solver(A, B):
-    """Solve the matrix problem in fourier space. """
-    n_components = A.shape[0]
-    n_points = A.shape[-1]
+def solver(A, B, out=None, method='lu'):
+    """Solve the matrix problem in fourier space.
+
+    A and B have shape (..., n_components, n_components, n_points) and the
+    system A H = B is solved at every point and for every leading index.
+    Closed form expressions are used for one and two components and batched
+    LAPACK calls for more.
+
+    Parameters
+    ----------
+    A : np.ndarray, shape=(..., n_comps, n_comps, n_pts), dtype=float
+    B : np.ndarray, shape=(..., n_comps, n_comps, n_pts), dtype=float
+    out : np.ndarray, optional
+        Array to write the result to.
+    method : str, optional, default='lu'
+        'lu' solves the general problem. 'cholesky' requires B = I - A with a
+        symmetric A, as is the case for the density scaled OZ equation, and
+        computes H = A^-1 - I from a batched Cholesky factorization of A.
+        Points where A is not positive definite, i.e. where a structure
+        factor is negative, are solved with LU instead.
 
-    if n_components == 1:
+    """
+    if out is None:
+        out = np.empty(np.broadcast(A, B).shape,
+                       dtype=np.result_type(A, B))
+    n_components = A.shape[-3]
+    if method == 'lu' and n_components == 1:
         if (A == 0).any():
             raise PyozError('Singular matrix, cannot invert')
-        H_k = B / A
-    elif n_components == 2:
-        H_k = np.empty_like(A)
-        A_det = A[0, 0] * A[1, 1] - A[1, 0] * A[0, 1]
-        if (A_det == 0.0).any():
+        return np.divide(B, A, out=out)
+    elif method == 'lu' and n_components == 2:
+        return _solve_2x2(A, B, out)
+    elif method == 'lu':
+        try:
+            H_k = np.linalg.solve(np.moveaxis(A, -1, -3),
+                                  np.moveaxis(B, -1, -3))
+        except np.linalg.LinAlgError:
             raise PyozError('Singular matrix, cannot invert')
+    elif method == 'cholesky':
+        A_k = np.moveaxis(A, -1, -3)
+        try:
+            H_k = _cholesky_solve(A_k)
+        except np.linalg.LinAlgError:
+            # Intermediate iterates need not have positive structure factors.
+            # Solve the points where A is not positive definite with LU.
+            B_k = np.broadcast_to(np.moveaxis(B, -1, -3), A_k.shape)
+            definite = np.linalg.eigvalsh(A_k).min(axis=-1) > 0
+            H_k = np.empty(A_k.shape, dtype=out.dtype)
+            try:
+                H_k[definite] = _cholesky_solve(A_k[definite])
+            except np.linalg.LinAlgError:
+                definite[...] = False
+            try:
+                H_k[~definite] = np.linalg.solve(A_k[~definite],
+                                                 B_k[~definite])
+            except np.linalg.LinAlgError:
+                raise PyozError('Singular matrix, cannot invert')
+    else:
+        raise PyozError('Unsupported linear solver: ', method)
+    out[...] = np.moveaxis(H_k, -3, -1)
+    return out
+
+
+def _cholesky_solve(A):
+    """Compute A^-1 - I for a stack of symmetric positive definite A. """
+    L_inv = np.linalg.inv(np.linalg.cholesky(A))
+    H = np.matmul(np.swapaxes(L_inv, -1, -2), L_inv)
+    H -= np.eye(A.shape[-1])
+    return H
+
 
-        for dr in range(n_points):
-            A_inv = np.ones(shape=(2, 2,)) / A_det[dr]
-            A_inv[0, 0] *= A[1, 1, dr]
-            A_inv[0, 1] *= -A[0, 1, dr]
-            A_inv[1, 0] *= -A[1, 0, dr]
-            A_inv[1, 1] *= A[0, 0, dr]
-
-            # h[:,:,dr] = (mat(a_inv[dr]) * mat(b[:,:,dr])) / dens_factor
-            # explicitly - is faster
-            H_k[0, 0, dr] = A_inv[0, 0]*B[0, 0, dr] + A_inv[0, 1]*B[1, 0, dr]
-            H_k[0, 1, dr] = A_inv[0, 0]*B[0, 1, dr] + A_inv[0, 1]*B[1, 1, dr]
-            H_k[1, 0, dr] = A_inv[1, 0]*B[0, 0, dr] + A_inv[1, 1]*B[1, 0, dr]
-            H_k[1, 1, dr] = A_inv[1, 0]*B[0, 1, dr] + A_inv[1, 1]*B[1, 1, dr]
-    elif A.shape[0] >= 2:
-        H_k = np.empty_like(A)
-        for dr in range(n_points):
-            H_k[:, :, dr] = np.linalg.solve(A[:, :, dr], B[:, :, dr])
-    return H_k
-
-
-def picard_iteration(e_r, e_r_previous, mix):
-    return (1 - mix) * e_r_previous + mix * e_r
+def _solve_2x2(A, B, out):
+    """Solve two component problems with the adjugate of A. """
+    a, b = A[..., 0, 0, :], A[..., 0, 1, :]
+    c, d = A[..., 1, 0, :], A[..., 1, 1, :]
+    det = a * d - b * c
+    if (det == 0.0).any():
+        raise PyozError('Singular matrix, cannot invert')
+    B_00, B_01 = B[..., 0, 0, :], B[..., 0, 1, :]
+    B_10, B_11 = B[..., 1, 0, :], B[..., 1, 1, :]
+    # Compute all four entries before writing in case `out` aliases B.
+    H_00 = (d * B_00 - b * B_10) / det
+    H_01 = (d * B_01 - b * B_11) / det
+    H_10 = (a * B_10 - c * B_00) / det
+    H_11 = (a * B_11 - c * B_01) / det
+    out[..., 0, 0, :] = H_00
+    out[..., 0, 1, :] = H_01
+    out[..., 1, 0, :] = H_10
+    out[..., 1, 1, :] = H_11
+    return out
 
+
+def picard_iteration(e_r, e_r_previous, mix, out=None):
+    """Mix the old and new indirect correlation functions.
+
+    e_r_new = (1 - mix) * e_r_previous + mix * e_r
+
+    The result is written to `out` if given, which may be `e_r_previous` but
+    not `e_r`.
+    """
+    out = np.subtract(e_r_previous, e_r, out=out)
+    out *= 1 - mix
+    out += e_r
+    return out
+
+
+def atomic_savez(path, compressed=False, **arrays):
+    """Write arrays to an `.npz` file without exposing partial writes.
+
+    The file is written to a temporary file in the same directory, which
+    then replaces `path`. Readers, possibly in other processes, see either
+    the old or the new file.
+    """
+    handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path),
+                                         suffix='.tmp')
+    savez = np.savez_compressed if compressed else np.savez
+    try:
+        with os.fdopen(handle, 'wb') as f:
+            savez(f, **arrays)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
@@ -0,0 +1,173 @@
+"""Wall time, call counts and memory of the phases of the solve loop.
+
+Profiling is off unless a `Profiler` is active, in which case every phase of
+every solve is accumulated into it:
+
+    >>> import pyoz as oz
+    >>> with oz.profile() as profiler:
+    ...     lj.solve(rhos=0.6)
+    ...     lj.solve(rhos=0.7)
+    >>> print(profiler)
+
+A single solve can also be profiled with `System.solve(profile=True)`, which
+stores its profiler as `System.solve_profile`.
+
+Phases may be nested, e.g. the closure and the transforms within the Krylov
+solve of the Newton-Krylov method. The time of a phase excludes that of the
+phases nested in it, so that the times of all phases add up to the total.
+The peak memory of a phase includes that of its nested phases.
+
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+import time
+import tracemalloc
+
+
+__all__ = ['Profiler', 'profile']
+
+# Profilers that phases are currently recorded into.
+_active_profilers = []
+# Phases that have been entered and not yet exited, innermost last.
+_open_phases = []
+
+
+class Profiler(object):
+    """Accumulates wall time, call counts and peak memory per phase.
+
+    Parameters
+    ----------
+    track_memory : bool, optional, default=False
+        Also record the peak memory allocated within each phase, using
+        `tracemalloc`. This slows down the solve noticeably.
+
+    """
+    def __init__(self, track_memory=False):
+        self.track_memory = track_memory
+        self.times = OrderedDict()
+        self.calls = OrderedDict()
+        self.peak_memory = OrderedDict()
+
+    def add(self, name, elapsed, peak_memory=None):
+        """Record one call of a phase. """
+        self.times[name] = self.times.get(name, 0.0) + elapsed
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if peak_memory is not None:
+            self.peak_memory[name] = max(self.peak_memory.get(name, 0),
+                                         peak_memory)
+
+    def report(self):
+        """Return a dict with the time, calls and peak memory of every phase.
+
+        Times are in seconds, excluding nested phases, and memory in bytes;
+        peak memory is None unless `track_memory` is set.
+        """
+        return OrderedDict(
+            (name, {'time': self.times[name],
+                    'calls': self.calls[name],
+                    'peak_memory': self.peak_memory.get(name)})
+            for name in self.times)
+
+    def __str__(self):
+        total = sum(self.times.values())
+        lines = ['{:20s}{:>10s}{:>8s}{:>10s}{:>12s}'.format(
+            'phase', 'time (s)', '%', 'calls', 'peak (MB)')]
+        for name, entry in self.report().items():
+            peak = entry['peak_memory']
+            lines.append('{:20s}{:>10.3f}{:>8.1f}{:>10d}{:>12s}'.format(
+                name, entry['time'], 100 * entry['time'] / (total or 1),
+                entry['calls'],
+                '-' if peak is None else '{:.2f}'.format(peak / 1e6)))
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return '<Profiler; {} phases; {:.3f}s>'.format(
+            len(self.times), sum(self.times.values()))
+
+
+@contextmanager
+def profile(profiler=None, track_memory=False):
+    """Record the phases of all solves within the context.
+
+    Parameters
+    ----------
+    profiler : Profiler, optional
+        The profiler to accumulate into, e.g. to continue a previous one.
+    track_memory : bool, optional, default=False
+        Passed on to a newly created `Profiler`.
+
+    Yields
+    ------
+    profiler : Profiler
+
+    """
+    if profiler is None:
+        profiler = Profiler(track_memory=track_memory)
+    started_tracing = False
+    if profiler.track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        started_tracing = True
+    _active_profilers.append(profiler)
+    try:
+        yield profiler
+    finally:
+        _active_profilers.remove(profiler)
+        if started_tracing:
+            tracemalloc.stop()
+
+
+class _Phase(object):
+    """Times one call of a phase for all active profilers. """
+    __slots__ = ('name', 'start', 'memory', 'peak', 'nested_time')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.memory = self.peak = None
+        self.nested_time = 0.0
+        # `reset_peak` requires Python 3.9.
+        if (hasattr(tracemalloc, 'reset_peak') and tracemalloc.is_tracing()
+                and any(profiler.track_memory
+                        for profiler in _active_profilers)):
+            # Keep the peak reached so far by the enclosing phase.
+            current, peak = tracemalloc.get_traced_memory()
+            if _open_phases and _open_phases[-1].peak is not None:
+                _open_phases[-1].peak = max(_open_phases[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self.memory = self.peak = current
+        _open_phases.append(self)
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        _open_phases.remove(self)
+        if _open_phases:
+            _open_phases[-1].nested_time += elapsed
+        peak = None
+        if self.memory is not None:
+            peak = (max(self.peak, tracemalloc.get_traced_memory()[1])
+                    - self.memory)
+        for profiler in _active_profilers:
+            profiler.add(self.name, elapsed - self.nested_time,
+                         peak if profiler.track_memory else None)
+
+
+class _NullPhase(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_null_phase = _NullPhase()
+
+
+def phase(name):
+    """Context manager timing a phase of the solve loop, if profiling. """
+    if not _active_profilers:
+        return _null_phase
+    return _Phase(name)
@@ -143,7 +143,11 @@ def pressure_virial(system):
     dr = r[1] - r[0]
     dUdr = (np.diff(U_r) / dr)
 
-    integral = integrate(y=r[1:]**3 * g_r[:, :, 1:] * dUdr, x=r[1:])
+    # Within the core, g(r) is round-off while dU/dr is huge. Leave out
+    # distances at which the Boltzmann factor is below machine precision.
+    core = U_r[:, :, 1:] / kT > -np.log(np.finfo(float).eps)
+    integrand = np.where(core, 0, r[1:]**3 * g_r[:, :, 1:] * dUdr)
+    integral = integrate(y=integrand, x=r[1:])
 
     rhos = np.diag(rho_ij)
     rho = np.sum(rhos)
@@ -0,0 +1,181 @@
+"""Memory and work estimates of solves, and worker counts that fit them.
+
+`estimate_solve` predicts the peak memory of one solve and the floating point
+operations of one pass through the closure and the OZ equation.
+`plan_workers` turns an estimate into a number of processes and threads per
+process that keeps all cores busy without exceeding a memory budget. Scans
+use both when no number of workers is given:
+
+    >>> estimate = oz.estimate_solve(10, 2**16, method='nk')
+    >>> processes, threads = oz.plan_workers(estimate, n_tasks=1000)
+
+The estimates are rough; they count the arrays held by pyoz and ignore
+temporaries of numpy and the FFT library.
+
+"""
+from collections import namedtuple
+import os
+
+import numpy as np
+
+from pyoz.engines import supported_methods, fixed_point, newton_krylov, gillan
+from pyoz.exceptions import PyozError
+from pyoz.iteration import (supported_iteration_schemes, AdaptivePicard,
+                            Anderson, Ng)
+
+
+__all__ = ['estimate_solve', 'plan_workers', 'available_cpus',
+           'available_memory']
+
+# Memory of a worker process before it allocates any arrays.
+PROCESS_OVERHEAD = 100e6
+# Map evaluations that are cheaper than this do not benefit from threads.
+MIN_THREADED_FLOPS = 1e8
+
+# Correlation function arrays held during every solve: the potential, the
+# input and output of the iteration, the results, the workspace and the
+# sine transform.
+_base_arrays = 14
+# Additional arrays held by the iteration schemes, besides the history of
+# Anderson mixing.
+_scheme_arrays = {AdaptivePicard: 1, Ng: 6}
+# Additional arrays held by the methods, besides the Krylov subspace.
+_method_arrays = {fixed_point: 0, newton_krylov: 8, gillan: 4}
+
+
+class ResourceEstimate(namedtuple('ResourceEstimate', 'memory flops')):
+    """Peak memory of a solve in bytes and flops per map evaluation. """
+
+
+def estimate_solve(n_components, n_pts, method='fixed-point',
+                   iteration_scheme='picard', precision='double',
+                   method_options=None, batch_size=1):
+    """Estimate the resources needed by a solve.
+
+    Parameters
+    ----------
+    n_components : int
+        Number of components of the system.
+    n_pts : int
+        Number of grid points.
+    method, iteration_scheme, method_options
+        As passed to `System.solve`.
+    precision : str, optional, default='double'
+        Precision of the system.
+    batch_size : int, optional, default=1
+        Number of states solved together by `System.solve_batch`.
+
+    Returns
+    -------
+    estimate : ResourceEstimate
+        `memory`, the peak memory of the solve in bytes, and `flops`, the
+        floating point operations of one map evaluation.
+
+    """
+    try:
+        engine = supported_methods[method.lower()]
+    except KeyError:
+        raise PyozError('Unsupported method: ', method)
+    if isinstance(iteration_scheme, str):
+        try:
+            iteration_scheme = supported_iteration_schemes[
+                iteration_scheme.lower()]()
+        except KeyError:
+            raise PyozError('Unsupported iteration scheme: ',
+                            iteration_scheme)
+    options = method_options or {}
+    n_arrays = _base_arrays + _method_arrays[engine]
+    n_arrays += _scheme_arrays.get(type(iteration_scheme), 0)
+    if isinstance(iteration_scheme, Anderson):
+        n_arrays += 2 * (iteration_scheme.n_history + 1)
+    if engine is newton_krylov:
+        n_arrays += options.get('inner_maxiter', 30)
+
+    itemsize = 4 if precision == 'single' else 8
+    size = batch_size * n_components**2 * n_pts
+    memory = n_arrays * size * itemsize
+    n_pairs = n_components * (n_components + 1) // 2
+    if engine is gillan:
+        n_coarse = n_pairs * options.get('n_basis', 20)
+        memory += 2 * n_coarse**2 * 8
+
+    flops = batch_size * n_pts * (
+        10 * n_components**2  # Closure.
+        + 10 * n_pairs * np.log2(max(n_pts, 2))  # Two sine transforms.
+        + 5 * n_components**3)  # Solve in k-space.
+    return ResourceEstimate(int(memory), float(flops))
+
+
+def plan_workers(estimate, n_tasks=None, memory_budget=None, cpus=None,
+                 max_processes=None):
+    """Choose the number of processes and threads for independent solves.
+
+    Parameters
+    ----------
+    estimate : ResourceEstimate
+        The resources of one solve, see `estimate_solve`.
+    n_tasks : int, optional
+        Number of solves. No more processes than solves are started.
+    memory_budget : float, optional
+        Bytes available to all processes together. Defaults to the
+        available memory of the machine, if it can be determined.
+    cpus : int, optional
+        Number of cores to use. Defaults to those available to this
+        process.
+    max_processes : int, optional
+        Upper bound for the number of processes, e.g. requested by the
+        caller. The threads are chosen for the bounded number.
+
+    Returns
+    -------
+    processes : int
+    threads : int
+        Threads per process for the FFT and BLAS libraries.
+
+    """
+    if cpus is None:
+        cpus = available_cpus()
+    if memory_budget is None:
+        memory_budget = available_memory()
+    processes = cpus
+    if n_tasks is not None:
+        processes = min(processes, max(n_tasks, 1))
+    if memory_budget is not None:
+        fitting = int(memory_budget // (estimate.memory + PROCESS_OVERHEAD))
+        if fitting < 1:
+            raise PyozError('A single solve needs about {:.0f} MB, more than '
+                            'the memory budget of {:.0f} MB.'.format(
+                                (estimate.memory + PROCESS_OVERHEAD) / 1e6,
+                                memory_budget / 1e6))
+        processes = min(processes, fitting)
+    if max_processes is not None:
+        processes = min(processes, max(max_processes, 1))
+    threads = 1
+    if estimate.flops >= MIN_THREADED_FLOPS:
+        threads = max(cpus // processes, 1)
+    return processes, threads
+
+
+def available_cpus():
+    """Return the number of cores available to this process. """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def available_memory():
+    """Return the available memory in bytes, or None if unknown. """
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        return psutil.virtual_memory().available
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (IOError, OSError, ValueError):
+        pass
+    return None
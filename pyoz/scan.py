@@ -0,0 +1,477 @@
+"""Solve a system on a grid of parameters and collect properties.
+
+A `Scan` is declared by its parameter axes, a function building the system
+for one point of the grid and the properties to collect. Points are solved
+in parallel, on a local process pool or on a dask cluster, and their results
+go straight into one array per property. Completed points are checkpointed
+to a single file, so an interrupted scan resumes where it left off.
+Large scans should write into a `pyoz.ResultStore` instead, which keeps the
+results on disk and can be read while the scan is running:
+
+    >>> def build(kT, rho):
+    ...     lj = oz.System(kT=kT)
+    ...     lj.set_interaction(0, 0, oz.lennard_jones(lj.r, eps=1, sig=1))
+    ...     return lj, rho
+    >>> scan = oz.Scan(OrderedDict([('kT', [1.5, 2.0]),
+    ...                             ('rho', [0.2, 0.4, 0.6])]),
+    ...                build, properties=['g_r', 'pressure_virial'],
+    ...                store='lj_scan', mix_param=0.5)
+    >>> results = scan.run(workers=4)
+    >>> results['pressure_virial'].shape
+    (2, 3)
+
+`build` must be picklable, i.e. defined at the top level of a module.
+
+On a process pool, arrays passed as `shared`, e.g. a potential table or a
+reference solution, are published once into shared memory instead of being
+sent with every point. Array valued properties are written by the workers
+straight into shared buffers, or into the files of the `store`, once the
+first point has fixed their shapes.
+
+Unless given, the number of processes and the threads per process are
+chosen by `pyoz.plan_workers` from the memory and work of a solve, and no
+more points are queued than the workers can take on.
+
+"""
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+import os
+
+import numpy as np
+
+import pyoz as oz
+from pyoz.exceptions import PyozError
+from pyoz.fft import ScipyBackend, FFTWBackend, get_fft_backend
+from pyoz.misc import atomic_savez
+from pyoz.resources import estimate_solve, plan_workers, available_cpus
+from pyoz.shared import SharedArrays, attach, share_file
+from pyoz.store import ResultStore
+
+
+__all__ = ['Scan', 'scan_backend_names']
+
+scan_backend_names = ('serial', 'process', 'dask')
+
+
+class Scan(object):
+    """A grid of state points and the properties collected at each of them.
+
+    Parameters
+    ----------
+    axes : OrderedDict
+        Maps parameter names to the values they take. The results have one
+        dimension per axis, in this order.
+    build : callable
+        Called as `build(**point, **shared)` for every point of the grid. It
+        must return the system and the densities to pass to `System.solve`,
+        optionally followed by a dict of further arguments for the solve.
+    properties : list of str or callable
+        What to collect at every converged point. Strings name a function
+        in `pyoz`, e.g. 'pressure_virial', or an attribute of the solved
+        system, e.g. 'g_r'. Callables are called with the solved system and
+        stored under their `__name__`.
+    checkpoint : str, optional
+        File in which completed points are recorded. If it exists, the scan
+        resumes from it.
+    store : str, optional
+        Directory of a `pyoz.ResultStore` to write the results into rather
+        than holding them in memory. If it exists, the scan resumes from it.
+    checkpoint_every : int, optional, default=10
+        Number of completed points between two writes of the checkpoint,
+        or flushes of the store.
+    shared : dict of np.ndarray, optional
+        Read-only arrays passed to `build` as keyword arguments, e.g. `U_r`.
+    **solve_kwargs
+        Passed on to `System.solve` for every point. With a `warm_start`
+        database, the parameters of the points are its `warm_start_params`.
+
+    """
+    def __init__(self, axes, build, properties, checkpoint=None, store=None,
+                 checkpoint_every=10, shared=None, **solve_kwargs):
+        if not axes:
+            raise PyozError('A scan needs at least one axis.')
+        self.axes = OrderedDict((name, np.asarray(values))
+                                for name, values in axes.items())
+        for name, values in self.axes.items():
+            if values.ndim != 1 or values.size == 0:
+                raise PyozError('Axis `{}` must be a non-empty, one '
+                                'dimensional sequence.'.format(name))
+        self.build = build
+        self.properties = OrderedDict()
+        for prop in properties:
+            name = prop if isinstance(prop, str) else prop.__name__
+            if name in ('converged', 'n_iter'):
+                raise PyozError('`{}` is always recorded.'.format(name))
+            self.properties[name] = prop
+        if checkpoint is not None and store is not None:
+            raise PyozError('Use either `checkpoint` or `store`.')
+        self.checkpoint = checkpoint
+        if checkpoint is not None:
+            self.checkpoint = os.path.abspath(os.path.expanduser(checkpoint))
+        self.checkpoint_every = checkpoint_every
+        self.shared = OrderedDict(shared or {})
+        for name in self.shared:
+            if name in self.axes:
+                raise PyozError('`{}` is both an axis and a shared '
+                                'array.'.format(name))
+        self.solve_kwargs = solve_kwargs
+
+        self.shape = tuple(values.size for values in self.axes.values())
+        self.store = None
+        if store is not None:
+            self.store = ResultStore(store, self.axes)
+            for name, dtype in (('converged', bool), ('n_iter', int)):
+                if name not in self.store:
+                    self.store.create(name, (), dtype=dtype)
+            self.completed = self.store['completed']
+            self.results = OrderedDict(
+                (name, self.store[name])
+                for name in ['converged', 'n_iter'] + list(self.properties)
+                if name in self.store)
+            if self.n_completed:
+                oz.logger.info('Resuming scan with {} of {} points '
+                               'completed'.format(self.n_completed,
+                                                  self.n_points))
+            return
+        self.completed = np.zeros(self.shape, dtype=bool)
+        self.results = OrderedDict(
+            [('converged', np.zeros(self.shape, dtype=bool)),
+             ('n_iter', np.zeros(self.shape, dtype=int))])
+        if self.checkpoint is not None and os.path.exists(self.checkpoint):
+            self._load()
+
+    @property
+    def n_points(self):
+        return self.completed.size
+
+    @property
+    def n_completed(self):
+        return int(self.completed.sum())
+
+    def points(self):
+        """Yield the index and the parameters of every point of the grid. """
+        for index in np.ndindex(self.shape):
+            yield index, self._point(index)
+
+    def _point(self, index):
+        return OrderedDict((name, values[n].item()) for n, (name, values)
+                           in zip(index, self.axes.items()))
+
+    def run(self, workers=None, backend='process', client=None, threads=None,
+            memory_budget=None):
+        """Solve all points that are not completed yet.
+
+        Parameters
+        ----------
+        workers : int, optional
+            Number of worker processes. Chosen from the estimated resources
+            of a solve and the available cores and memory by default.
+        backend : str, optional, default='process'
+            'process' for a local process pool, 'dask' for a
+            `distributed.Client` and 'serial' to solve in this process.
+        client : distributed.Client, optional
+            The dask client to submit to. A local cluster with `workers`
+            workers is started if None.
+        threads : int, optional
+            Threads per worker for the FFT backend and, if `threadpoolctl`
+            is installed, the BLAS library. Chosen with `workers` by
+            default. Systems with their own `fft_backend` are not affected.
+        memory_budget : float, optional
+            Bytes available to all workers together. Limits the number of
+            workers. Defaults to the available memory.
+
+        Returns
+        -------
+        results : OrderedDict of np.ndarray
+            The `converged` flag and number of iterations of every point,
+            followed by the properties. Property arrays have the shape of the
+            grid followed by the shape of the property and are NaN where a
+            point did not converge.
+
+        """
+        if backend not in scan_backend_names:
+            raise PyozError('Unsupported scan backend: {}. Valid options '
+                            'are: {}'.format(backend,
+                                             ', '.join(scan_backend_names)))
+        todo = [(index, point) for index, point in self.points()
+                if not self.completed[index]]
+        return self._run(todo, workers, backend, client, threads,
+                         memory_budget)
+
+    def _run(self, todo, workers, backend, client, threads, memory_budget):
+        """Solve the points in `todo`, see `run`. """
+        oz.logger.info('Scanning {} of {} points'.format(len(todo),
+                                                         self.n_points))
+        if backend != 'serial' and todo and (
+                workers is None or threads is None
+                or memory_budget is not None):
+            workers, planned_threads = self._plan(todo[0][1], len(todo),
+                                                  memory_budget, workers)
+            threads = planned_threads if threads is None else threads
+            oz.logger.info('Using {} workers with {} threads each'.format(
+                workers, threads))
+        args = (self.build, self.properties, self.solve_kwargs, self.shared)
+        n_unsaved = 0
+        if backend == 'process' and todo and any(
+                name not in self.results for name in self.properties):
+            # Solve the first point here to learn the shapes of the outputs.
+            self._store(*_solve_point(*todo.pop(0), *args))
+            n_unsaved += 1
+        shared = SharedArrays() if backend == 'process' else None
+        try:
+            if shared is not None:
+                args = self._share(shared)
+            for result in self._execute(todo, args, workers, backend, client,
+                                        threads, memory_budget):
+                self._store(*result)
+                n_unsaved += 1
+                if n_unsaved >= self.checkpoint_every:
+                    self.save()
+                    n_unsaved = 0
+        finally:
+            if shared is not None:
+                for name, values in shared.arrays.items():
+                    if self.results.get(name) is values:
+                        self.results[name] = values.copy()
+                shared.close()
+            if n_unsaved:
+                self.save()
+        return self.results
+
+    def save(self):
+        """Write the completed points to the checkpoint file or store. """
+        if self.store is not None:
+            self.store.flush()
+            return
+        if self.checkpoint is None:
+            return
+        arrays = {'completed': self.completed}
+        for name, values in self.axes.items():
+            arrays['axis:' + name] = values
+        for name, values in self.results.items():
+            arrays['result:' + name] = values
+        atomic_savez(self.checkpoint, **arrays)
+
+    def to_xarray(self):
+        """Return the results as an `xarray.Dataset`.
+
+        Trailing dimensions of a property are named `<property>_dim_<n>`.
+        """
+        try:
+            import xarray
+        except ImportError:
+            raise PyozError('`to_xarray` requires `xarray`:\n\n'
+                            '"conda install -c conda-forge xarray"\n\n')
+        data_vars = OrderedDict()
+        for name, values in self.results.items():
+            dims = list(self.axes) + ['{}_dim_{}'.format(name, n) for n
+                                      in range(values.ndim - len(self.shape))]
+            data_vars[name] = (dims, values)
+        return xarray.Dataset(data_vars, coords=self.axes)
+
+    def _share(self, shared):
+        """Publish the inputs and outputs of the workers. """
+        inputs = OrderedDict((name, shared.add(name, values)) for name, values
+                             in self.shared.items())
+        outputs = OrderedDict()
+        for name in self.properties:
+            if name not in self.results:
+                continue
+            if self.store is not None:
+                outputs[name] = share_file(self.store._path(name),
+                                           writeable=True)
+            else:
+                outputs[name] = shared.add(name, self.results[name],
+                                           writeable=True)
+                self.results[name] = shared.arrays[name]
+        return (self.build, self.properties, self.solve_kwargs, inputs,
+                outputs)
+
+    def _plan(self, point, n_tasks, memory_budget, max_workers=None):
+        """Choose the number of workers and threads from a sample point. """
+        system, _, kwargs = unpack_build(self.build(**point, **self.shared),
+                                         self.solve_kwargs)
+        estimate = estimate_solve(
+            system.n_components, system.n_pts,
+            method=kwargs.get('method', 'fixed-point'),
+            iteration_scheme=kwargs.get('iteration_scheme', 'picard'),
+            precision=system.precision,
+            method_options=kwargs.get('method_options'))
+        return plan_workers(estimate, n_tasks=n_tasks,
+                            memory_budget=memory_budget,
+                            max_processes=max_workers)
+
+    def _execute(self, todo, args, workers, backend, client, threads=None,
+                 memory_budget=None):
+        """Yield the results of `todo` in the order they complete.
+
+        At most two points per worker are queued at any time.
+        """
+        if backend == 'serial':
+            for index, point in todo:
+                yield _solve_point(index, point, *args)
+            return
+        workers = workers or available_cpus()
+        todo = iter(todo)
+        if backend == 'process':
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=_init_worker,
+                                     initargs=(threads,)) as executor:
+                pending = {executor.submit(_solve_point, index, point, *args)
+                           for index, point in islice(todo, 2 * workers)}
+                try:
+                    while pending:
+                        done, pending = wait(pending,
+                                             return_when=FIRST_COMPLETED)
+                        for future in done:
+                            for index, point in islice(todo, 1):
+                                pending.add(executor.submit(
+                                    _solve_point, index, point, *args))
+                            yield future.result()
+                finally:
+                    for future in pending:
+                        future.cancel()
+        else:
+            try:
+                import distributed
+            except ImportError:
+                raise PyozError('The dask backend requires `distributed`:\n\n'
+                                '"conda install -c conda-forge distributed"'
+                                '\n\n')
+            own_client = client is None
+            if own_client:
+                client = distributed.Client(
+                    n_workers=workers, threads_per_worker=1,
+                    memory_limit='auto' if memory_budget is None
+                    else int(memory_budget / workers))
+            try:
+                if threads is not None:
+                    client.run(_init_worker, threads)
+                if args[3]:
+                    args = args[:3] + (client.scatter(args[3],
+                                                      broadcast=True),)
+                submitted = [client.submit(_solve_point, index, point, *args,
+                                           pure=False)
+                             for index, point in islice(todo, 2 * workers)]
+                futures = distributed.as_completed(submitted)
+                try:
+                    for future in futures:
+                        for index, point in islice(todo, 1):
+                            submitted.append(client.submit(
+                                _solve_point, index, point, *args,
+                                pure=False))
+                            futures.add(submitted[-1])
+                        yield future.result()
+                finally:
+                    client.cancel(submitted)
+            finally:
+                if own_client:
+                    client.close()
+
+    def _store(self, index, converged, n_iter, values):
+        self.results['converged'][index] = converged
+        self.results['n_iter'][index] = n_iter
+        for name, value in values.items():
+            if self.store is not None:
+                self.store.write(index, name, value)
+                self.results[name] = self.store[name]
+                continue
+            if name not in self.results:
+                self.results[name] = np.full(self.shape + value.shape, np.nan)
+            elif self.results[name].shape[len(self.shape):] != value.shape:
+                raise PyozError('Shape of `{}` changed between points: {} '
+                                'and {}.'.format(
+                                    name, self.results[name].shape[
+                                        len(self.shape):], value.shape))
+            self.results[name][index] = value
+        # Marked last, so that readers of a store only see complete rows.
+        self.completed[index] = True
+
+    def _load(self):
+        with np.load(self.checkpoint) as data:
+            axes = OrderedDict((key[len('axis:'):], data[key])
+                               for key in data.files
+                               if key.startswith('axis:'))
+            if (list(axes) != list(self.axes)
+                    or not all(np.array_equal(axes[name], values)
+                               for name, values in self.axes.items())):
+                raise PyozError('The axes of checkpoint {} do not match the '
+                                'scan.'.format(self.checkpoint))
+            self.completed = data['completed']
+            for key in data.files:
+                if key.startswith('result:'):
+                    self.results[key[len('result:'):]] = data[key]
+        oz.logger.info('Resuming scan with {} of {} points completed'.format(
+            self.n_completed, self.n_points))
+
+    def __repr__(self):
+        return '<Scan; {}; {} of {} points completed>'.format(
+            ', '.join(self.axes), self.n_completed, self.n_points)
+
+
+def unpack_build(built, solve_kwargs):
+    """Split the result of a build callable into its parts.
+
+    Returns the system, the densities and the arguments for `System.solve`:
+    `solve_kwargs` updated with the optional dict returned by the build.
+    """
+    system, rhos = built[:2]
+    kwargs = dict(solve_kwargs, **(built[2] if len(built) > 2 else {}))
+    return system, rhos, kwargs
+
+
+def _init_worker(threads):
+    """Limit the threads of the FFT and BLAS libraries of a worker. """
+    if threads is None:
+        return
+    backend = get_fft_backend()
+    if isinstance(backend, ScipyBackend):
+        backend.workers = threads
+    elif isinstance(backend, FFTWBackend):
+        backend.threads = threads
+        backend._plans.clear()
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(limits=threads)
+
+
+def _solve_point(index, point, build, properties, solve_kwargs, inputs,
+                 outputs=None):
+    """Solve one point of a scan and evaluate its properties.
+
+    Properties in `outputs` are written into the referenced arrays, all
+    others are returned.
+    """
+    inputs = OrderedDict((name, attach(values))
+                         for name, values in inputs.items())
+    system, rhos, kwargs = unpack_build(build(**point, **inputs),
+                                        solve_kwargs)
+    if kwargs.get('warm_start') is not None:
+        # Nearby points of the scan are the closest warm starts.
+        kwargs.setdefault('warm_start_params', list(point.values()))
+    system.solve(rhos, **kwargs)
+    info = system.solve_info
+    values = OrderedDict()
+    if info['converged']:
+        for name, prop in properties.items():
+            value = np.asarray(_evaluate(system, prop), dtype=float)
+            if outputs and name in outputs:
+                attach(outputs[name])[index] = value
+            else:
+                values[name] = value
+    return index, bool(info['converged']), int(info['n_iter']), values
+
+
+def _evaluate(system, prop):
+    if callable(prop):
+        return prop(system)
+    function = getattr(oz, prop, None)
+    if callable(function):
+        return function(system)
+    if hasattr(system, prop):
+        return getattr(system, prop)
+    raise PyozError('Unknown property: {}. Use the name of a function in '
+                    '`pyoz` or of an attribute of `System`.'.format(prop))
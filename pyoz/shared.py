@@ -0,0 +1,116 @@
+"""Arrays that worker processes attach to without copying.
+
+The owning process publishes arrays into shared memory, or refers to arrays
+in `.npy` files, and hands out small, picklable `SharedArray` references.
+Workers turn them back into arrays with `attach`, which maps the memory
+instead of receiving a copy. Every segment is attached once per process.
+
+    >>> with oz.SharedArrays() as shared:
+    ...     U_r = shared.add('U_r', lj.U_r)
+    ...     pool.submit(work, U_r)
+    >>> def work(U_r):
+    ...     U_r = oz.attach(U_r)
+
+Shared memory requires Python 3.8.
+
+"""
+from collections import namedtuple, OrderedDict
+
+import numpy as np
+
+from pyoz.exceptions import PyozError
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+
+__all__ = ['SharedArray', 'SharedArrays', 'share_file', 'attach']
+
+# Arrays attached by this process, with the segments that keep them alive.
+_attached = dict()
+
+
+class SharedArray(namedtuple('SharedArray',
+                             'segment shape dtype path writeable')):
+    """A picklable reference to an array in shared memory or a `.npy` file.
+
+    Exactly one of `segment`, the name of a shared memory block, and `path`
+    is set.
+    """
+
+
+class SharedArrays(object):
+    """Arrays in shared memory that live as long as this object.
+
+    Use as a context manager, or call `close` when done, to free the memory.
+    """
+    def __init__(self):
+        if shared_memory is None:
+            raise PyozError('Shared memory requires Python 3.8 or later.')
+        self.arrays = OrderedDict()
+        self.handles = OrderedDict()
+        self._segments = []
+
+    def add(self, name, array, writeable=False):
+        """Copy an array into shared memory and return its reference. """
+        array = np.asarray(array)
+        self.empty(name, array.shape, array.dtype, writeable)[...] = array
+        return self.handles[name]
+
+    def empty(self, name, shape, dtype=float, writeable=True):
+        """Allocate an array in shared memory and return it. """
+        dtype = np.dtype(dtype)
+        shape = tuple(shape)
+        segment = shared_memory.SharedMemory(
+            create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+        self._segments.append(segment)
+        self.arrays[name] = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+        self.handles[name] = SharedArray(segment.name, shape, dtype.str, None,
+                                         writeable)
+        return self.arrays[name]
+
+    def close(self):
+        """Free the shared memory. Arrays returned earlier become invalid. """
+        self.arrays.clear()
+        self.handles.clear()
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return '<SharedArrays; {}>'.format(', '.join(self.arrays))
+
+
+def share_file(path, writeable=False):
+    """Return a reference to the array in a `.npy` file. """
+    return SharedArray(None, None, None, path, writeable)
+
+
+def attach(handle):
+    """Return the array a `SharedArray` refers to, mapped into memory.
+
+    Other objects are returned unchanged.
+    """
+    if not isinstance(handle, SharedArray):
+        return handle
+    if handle not in _attached:
+        if handle.path is not None:
+            array = np.load(handle.path,
+                            mmap_mode='r+' if handle.writeable else 'r')
+            segment = None
+        else:
+            segment = shared_memory.SharedMemory(name=handle.segment)
+            array = np.ndarray(handle.shape, dtype=handle.dtype,
+                               buffer=segment.buf)
+            array.flags.writeable = handle.writeable
+        _attached[handle] = array, segment
+    return _attached[handle][0]
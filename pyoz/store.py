@@ -0,0 +1,139 @@
+"""An on-disk store of scan results that is written one point at a time.
+
+Every property is kept in its own `.npy` file with the parameter axes first
+and the shape of the property, e.g. the r or k grid, last. The files are
+allocated when the first value of a property arrives and afterwards only
+the rows of completed points are written, so a scan never holds more than
+one point in memory. A `completed` mask records which rows are valid.
+
+The files can be opened memory mapped by other processes while the scan is
+still running:
+
+    >>> store = oz.ResultStore('lj_scan')
+    >>> done = store['completed']
+    >>> g_r = store['g_r'][done]
+
+"""
+from collections import OrderedDict
+import os
+
+import numpy as np
+
+from pyoz.exceptions import PyozError
+from pyoz.misc import atomic_savez
+
+
+__all__ = ['ResultStore']
+
+
+class ResultStore(object):
+    """A directory of memory mapped result arrays.
+
+    Parameters
+    ----------
+    directory : str
+        Where the arrays are stored.
+    axes : OrderedDict, optional
+        Maps parameter names to the values they take. Required to create a
+        new store; when opening an existing store, they must match the
+        stored axes.
+    mode : str, optional, default='r+'
+        'r' to only read the results, 'r+' to also write them.
+
+    """
+    _axes_file = 'axes.npz'
+
+    def __init__(self, directory, axes=None, mode='r+'):
+        if mode not in ('r', 'r+'):
+            raise PyozError("`mode` must be 'r' or 'r+'.")
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.mode = mode
+        axes_path = os.path.join(self.directory, self._axes_file)
+        if os.path.exists(axes_path):
+            with np.load(axes_path) as data:
+                self.axes = OrderedDict((name, data[name])
+                                        for name in data['names'])
+            if axes is not None and (
+                    list(axes) != list(self.axes)
+                    or not all(np.array_equal(values, self.axes[name])
+                               for name, values in axes.items())):
+                raise PyozError('The axes of store {} do not match.'.format(
+                    self.directory))
+        elif axes is None or mode == 'r':
+            raise PyozError('No result store in {}.'.format(self.directory))
+        else:
+            self.axes = OrderedDict((name, np.asarray(values))
+                                    for name, values in axes.items())
+            os.makedirs(self.directory, exist_ok=True)
+            atomic_savez(axes_path, names=np.array(list(self.axes)),
+                         **self.axes)
+        self.shape = tuple(values.size for values in self.axes.values())
+        self._arrays = dict()
+        if mode == 'r+' and 'completed' not in self:
+            self.create('completed', (), dtype=bool)
+
+    def create(self, name, shape, dtype=float):
+        """Allocate the array of a property of the given per-point shape.
+
+        Floating point arrays are NaN filled, others are zero filled.
+        """
+        self._check_writable()
+        path = self._path(name)
+        temp_path = path + '.tmp'
+        array = np.lib.format.open_memmap(temp_path, mode='w+', dtype=dtype,
+                                          shape=self.shape + tuple(shape))
+        if np.issubdtype(array.dtype, np.floating):
+            for n in range(array.shape[0]):
+                array[n] = np.nan
+        array.flush()
+        del array
+        os.replace(temp_path, path)
+        self._arrays[name] = np.load(path, mmap_mode='r+')
+        return self._arrays[name]
+
+    def write(self, index, name, value):
+        """Write the value of a property at one point of the grid. """
+        self._check_writable()
+        value = np.asarray(value)
+        if name not in self:
+            self.create(name, value.shape, dtype=value.dtype
+                        if value.dtype.kind in 'bi' else float)
+        array = self[name]
+        if array.shape[len(self.shape):] != value.shape:
+            raise PyozError('Shape of `{}` changed between points: {} and '
+                            '{}.'.format(name, array.shape[len(self.shape):],
+                                         value.shape))
+        array[index] = value
+
+    def flush(self):
+        """Write all changes to disk. """
+        for array in self._arrays.values():
+            array.flush()
+
+    def names(self):
+        """Return the names of all stored arrays. """
+        return sorted(name[:-len('.npy')]
+                      for name in os.listdir(self.directory)
+                      if name.endswith('.npy'))
+
+    def __getitem__(self, name):
+        if name not in self._arrays:
+            if name not in self:
+                raise KeyError(name)
+            self._arrays[name] = np.load(self._path(name),
+                                         mmap_mode=self.mode)
+        return self._arrays[name]
+
+    def __contains__(self, name):
+        return name in self._arrays or os.path.exists(self._path(name))
+
+    def __repr__(self):
+        return '<ResultStore; {}; {}>'.format(self.directory,
+                                              ', '.join(self.names()))
+
+    def _check_writable(self):
+        if self.mode == 'r':
+            raise PyozError('Store {} is read only.'.format(self.directory))
+
+    def _path(self, name):
+        return os.path.join(self.directory, name + '.npy')
@@ -0,0 +1,98 @@
+import numpy as np
+
+from pyoz.fft import get_fft_backend
+
+
+class SineTransform(object):
+    """Fourier transforms of radially symmetric pair functions.
+
+    All unique pairs (i <= j) of the symmetric `(..., n_comps, n_comps,
+    n_pts)` arrays are transformed with a single DST call along the last
+    axis. The density weighted prefactors are computed once, on creation.
+
+    F_ij(k) = rho_ij * 4 pi / k * int_0^inf r f_ij(r) sin(kr) dr
+    f_ij(r) = 1 / (2 pi^2 r rho_ij) * int_0^inf k F_ij(k) sin(kr) dk
+
+    Parameters
+    ----------
+    r : np.ndarray, shape=(n_pts,), dtype=float
+        Grid in real space.
+    k : np.ndarray, shape=(n_pts,), dtype=float
+        Grid in fourier space.
+    dr : float
+        Spacing of the grid in real space.
+    dk : float
+        Spacing of the grid in fourier space.
+    rho_ij : np.ndarray, shape=(..., n_comps, n_comps), dtype=float
+        Pair densities. Pairs with zero density transform to zero.
+    backend : optional
+        The DST backend, see `pyoz.fft`. Defaults to the global backend.
+    dtype : np.dtype, optional, default=float
+        Precision of the transformed arrays.
+
+    """
+    def __init__(self, r, k, dr, dk, rho_ij, backend=None, dtype=float):
+        n_pts = len(r)
+        self.r = r
+        self.k = k
+        self.rho_ij = rho_ij
+        self.backend = backend or get_fft_backend()
+        self.pairs = np.triu_indices(rho_ij.shape[-1])
+
+        rho_pairs = rho_ij[..., self.pairs[0], self.pairs[1]][..., np.newaxis]
+        forward_prefactor = 2 * np.pi * rho_pairs * dr / k
+        inverse_prefactor = n_pts * dk / 4 / np.pi**2 / (n_pts + 1) / r
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inverse_prefactor = np.where(rho_pairs == 0, 0,
+                                         inverse_prefactor / rho_pairs)
+        self.forward_prefactor = forward_prefactor.astype(dtype)
+        self.inverse_prefactor = inverse_prefactor.astype(dtype)
+        self.dtype = np.dtype(dtype)
+        self._r = r.astype(dtype)
+        self._k = k.astype(dtype)
+        self._dr = dr
+        self._dk = dk
+
+    def __getitem__(self, index):
+        """Return the transform for a subset of a stack of state points. """
+        return SineTransform(self.r, self.k, self._dr, self._dk,
+                             self.rho_ij[index], backend=self.backend,
+                             dtype=self.dtype)
+
+    def forward(self, f_r, out=None, work=None):
+        """Transform from real space to fourier space.
+
+        The result is written to `out` if given. `work`, of shape
+        `(..., n_pairs, n_pts)`, is used as scratch space if given.
+        """
+        work = self._unique_pairs(f_r, work)
+        work *= self._r
+        transform = self.backend.dst(work, overwrite_x=True)
+        transform *= self.forward_prefactor
+        return self._symmetrize(transform, f_r.shape, out)
+
+    def inverse(self, F_k, out=None, work=None):
+        """Transform from fourier space to real space.
+
+        The result is written to `out` if given. `work`, of shape
+        `(..., n_pairs, n_pts)`, is used as scratch space if given.
+        """
+        work = self._unique_pairs(F_k, work)
+        work *= self._k
+        transform = self.backend.dst(work, overwrite_x=True)
+        transform *= self.inverse_prefactor
+        return self._symmetrize(transform, F_k.shape, out)
+
+    def _unique_pairs(self, f, out):
+        n_components = f.shape[-2]
+        i, j = self.pairs
+        flat = f.reshape(f.shape[:-3] + (n_components**2, f.shape[-1]))
+        return np.take(flat, i * n_components + j, axis=-2, out=out)
+
+    def _symmetrize(self, unique, shape, out):
+        i, j = self.pairs
+        if out is None:
+            out = np.empty(shape=shape, dtype=unique.dtype)
+        out[..., i, j, :] = unique
+        out[..., j, i, :] = unique
+        return out
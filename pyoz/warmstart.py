@@ -0,0 +1,125 @@
+"""Initial guesses from previously converged, nearby state points.
+
+A `WarmStartDB` keeps the converged indirect correlation functions of past
+solves along with the parameters of their state point: the densities, the
+temperature and, optionally, parameters of the potentials. New solves on the
+same grid start from the closest stored state point, or from an inverse
+distance weighted average of the `n_neighbors` closest ones.
+
+    >>> db = oz.WarmStartDB('~/.pyoz_warm_start')
+    >>> for eps in np.linspace(0.5, 1.5, 11):
+    ...     lj.set_interaction(0, 0, oz.lennard_jones(lj.r, eps=eps, sig=1))
+    ...     lj.solve(rhos=0.6, warm_start=db, warm_start_params=[eps])
+
+"""
+import hashlib
+import os
+
+import numpy as np
+
+from pyoz.exceptions import PyozError
+from pyoz.misc import atomic_savez
+
+
+__all__ = ['WarmStartDB']
+
+
+class WarmStartDB(object):
+    """A persistent index of converged indirect correlation functions.
+
+    Parameters
+    ----------
+    directory : str
+        Where to store the entries. Created if it does not exist.
+    n_neighbors : int, optional, default=1
+        Number of stored state points combined into an initial guess.
+
+    """
+    def __init__(self, directory, n_neighbors=1):
+        if n_neighbors < 1:
+            raise PyozError('`n_neighbors` must be at least 1.')
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        os.makedirs(self.directory, exist_ok=True)
+        self.n_neighbors = n_neighbors
+        # Maps file names to the grid and parameters of their entry.
+        self._index = dict()
+
+    def add(self, system, rhos, e_r, params=None):
+        """Store the converged `e_r` of `system` at the densities `rhos`. """
+        grid, vector = self._grid(system), self._vector(system, rhos, params)
+        sha = hashlib.sha256(repr(grid).encode())
+        sha.update(vector.tobytes())
+        name = sha.hexdigest() + '.npz'
+
+        atomic_savez(os.path.join(self.directory, name),
+                     grid=np.array(grid), params=vector,
+                     e_r=np.asarray(e_r, dtype=float))
+        self._index[name] = (grid, vector)
+
+    def nearest(self, system, rhos, params=None):
+        """Return an initial guess for `e_r` and its distance to the state.
+
+        The distance is measured in parameters scaled by their spread in the
+        database. Returns `(None, None)` if nothing is stored for the grid of
+        `system` and the same number of parameters.
+        """
+        self._refresh()
+        grid, vector = self._grid(system), self._vector(system, rhos, params)
+        candidates = [(name, stored) for name, (stored_grid, stored)
+                      in self._index.items()
+                      if stored_grid == grid and stored.shape == vector.shape]
+        if not candidates:
+            return None, None
+
+        names = [name for name, _ in candidates]
+        stored = np.array([params for _, params in candidates])
+        scale = stored.std(axis=0)
+        scale[scale == 0] = 1
+        distances = np.sqrt((((stored - vector) / scale)**2).sum(axis=1))
+        closest = np.argsort(distances)[:self.n_neighbors]
+
+        if distances[closest[0]] == 0:
+            return self._load(names[closest[0]]), 0.0
+        weights = 1 / distances[closest]
+        weights /= weights.sum()
+        e_r = sum(weight * self._load(names[n])
+                  for weight, n in zip(weights, closest))
+        return e_r, float(distances[closest[0]])
+
+    def __len__(self):
+        self._refresh()
+        return len(self._index)
+
+    def __repr__(self):
+        return '<WarmStartDB; {}; {} entries>'.format(self.directory,
+                                                      len(self))
+
+    def _refresh(self):
+        """Index entries written since the last lookup, e.g. by others. """
+        names = {name for name in os.listdir(self.directory)
+                 if name.endswith('.npz')}
+        for name in set(self._index) - names:
+            del self._index[name]
+        for name in names - set(self._index):
+            try:
+                with np.load(os.path.join(self.directory, name)) as data:
+                    grid = tuple(data['grid'].tolist())
+                    self._index[name] = (grid, data['params'])
+            except (IOError, OSError, KeyError, ValueError):
+                continue
+
+    def _load(self, name):
+        with np.load(os.path.join(self.directory, name)) as data:
+            return data['e_r']
+
+    @staticmethod
+    def _grid(system):
+        return (float(system.dr), int(system.n_pts), int(system.n_components))
+
+    @staticmethod
+    def _vector(system, rhos, params):
+        rhos = np.atleast_1d(np.asarray(rhos, dtype=float))
+        if params is None:
+            params = []
+        params = np.atleast_1d(np.asarray(params, dtype=float))
+        return np.concatenate([rhos, [float(system.kT)], params])
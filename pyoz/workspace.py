@@ -0,0 +1,51 @@
+import numpy as np
+
+
+class Workspace(object):
+    """Preallocated buffers for the inner loop of `System.solve`.
+
+    A workspace is allocated once per grid and number of components and
+    reused by consecutive solves.
+
+    Parameters
+    ----------
+    shape : tuple
+        Shape of the correlation function arrays, `(..., n_comps, n_comps,
+        n_pts)`, including any leading batch axes.
+    dtype : np.dtype, optional, default=float
+        Precision of the buffers.
+
+    """
+    def __init__(self, shape, dtype=float, _buffers=None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        if _buffers is None:
+            n_components, n_pts = shape[-2], shape[-1]
+            n_pairs = n_components * (n_components + 1) // 2
+            pairs_shape = shape[:-3] + (n_pairs, n_pts)
+            _buffers = {'c_r': np.empty(shape=shape, dtype=dtype),
+                        'C_k': np.empty(shape=shape, dtype=dtype),
+                        'A': np.empty(shape=shape, dtype=dtype),
+                        'pairs': np.empty(shape=pairs_shape, dtype=dtype)}
+        self._buffers = _buffers
+        self.c_r = _buffers['c_r']
+        self.C_k = _buffers['C_k']
+        self.A = _buffers['A']
+        self.pairs = _buffers['pairs']
+
+        # Identity matrix at every point in k-space.
+        identity = np.eye(shape[-2], dtype=dtype)[:, :, np.newaxis]
+        self.E = np.broadcast_to(identity, shape[-3:])
+
+    def __getitem__(self, index):
+        """Return a view of the buffers for the first states of a batch. """
+        if not isinstance(index, slice) or index.start not in (None, 0):
+            raise IndexError('Workspaces can only be sliced from the start.')
+        buffers = {name: buffer[index]
+                   for name, buffer in self._buffers.items()}
+        return Workspace(buffers['c_r'].shape, dtype=self.dtype,
+                         _buffers=buffers)
+
+    def fits(self, shape, dtype=float):
+        """Check whether the buffers match arrays of the given shape. """
+        return self.shape == tuple(shape) and self.dtype == np.dtype(dtype)
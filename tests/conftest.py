@@ -5,6 +5,34 @@ import pyoz as oz
 from pyoz.potentials import arithmetic, geometric
 
 
+def make_lj_system(kT=2, eps=1, sig=1, **kwargs):
+    """Return an unsolved, unary Lennard-Jones system. """
+    lj = oz.System(kT=kT, **kwargs)
+    lj.set_interaction(0, 0, oz.lennard_jones(lj.r, eps=eps, sig=sig))
+    return lj
+
+
+def build_lj_system(kT, rho):
+    """Build a unary Lennard-Jones system on a small grid for a scan. """
+    return make_lj_system(kT=kT, n_points_exp=10), rho
+
+
+@pytest.fixture(scope='session')
+def lj_system():
+    """Return a factory of unsolved, unary Lennard-Jones systems.
+
+    Keyword arguments set the temperature, `eps` and `sig` of the potential
+    and are otherwise passed on to `pyoz.System`.
+    """
+    return make_lj_system
+
+
+@pytest.fixture(scope='session')
+def build_lj():
+    """Return a `pyoz.Scan` build callable over `kT` and `rho`. """
+    return build_lj_system
+
+
 @pytest.fixture(scope='session')
 def one_component_lj():
     """Return a solved, unary Lennard-Jones system. """
@@ -0,0 +1,54 @@
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+import pyoz as oz
+from pyoz.exceptions import PyozError
+
+
+def height(system):
+    return system.g_r.max()
+
+
+def test_convergence_boundary(build_lj):
+    scan = oz.AdaptiveScan(OrderedDict([('rho', [0.1, 0.5, 0.9, 1.3])]),
+                           lambda rho: build_lj(2.0, rho), [height],
+                           levels=4, mix_param=0.5, max_iter=300)
+    results = scan.run(backend='serial')
+    assert scan.n_points == 49
+    assert scan.n_completed < 10
+
+    # The boundary is resolved to the finest spacing.
+    solved = np.nonzero(scan.completed)[0]
+    converged = results['converged'][solved]
+    boundary = np.nonzero(converged[:-1] != converged[1:])[0]
+    assert len(boundary) == 1
+    assert solved[boundary[0] + 1] - solved[boundary[0]] == 1
+    assert np.isnan(results['height'][~results['converged']]).all()
+
+
+def test_criterion(tmpdir, build_lj):
+    axes = OrderedDict([('kT', [1.5, 2.0, 2.5]), ('rho', [0.1, 0.3, 0.5])])
+    kwargs = dict(levels=2, criterion='height', threshold=0.1,
+                  store=str(tmpdir.join('scan')), mix_param=0.5, max_iter=300)
+    scan = oz.AdaptiveScan(axes, build_lj, [height], **kwargs)
+    results = scan.run(backend='serial')
+    assert 9 < scan.n_completed < scan.n_points
+    assert results['converged'][scan.completed].all()
+    # Refined where the peak grows fastest, at low temperature and high
+    # density.
+    assert scan.completed[0, -2] and not scan.completed[-2, 1]
+
+    resumed = oz.AdaptiveScan(axes, build_lj, [height], **kwargs)
+    assert resumed.n_completed == scan.n_completed
+    resumed.run(backend='serial')
+    assert np.array_equal(resumed.completed, scan.completed)
+
+    with pytest.raises(PyozError):
+        oz.AdaptiveScan(axes, build_lj, [height], criterion='height')
+    with pytest.raises(PyozError):
+        oz.AdaptiveScan(axes, build_lj, [height], criterion='S_k',
+                        threshold=1)
+    with pytest.raises(PyozError):
+        oz.AdaptiveScan(OrderedDict([('rho', [0.5, 0.1])]), build_lj, [])
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+import pyoz as oz
+from pyoz.exceptions import PyozError
+
+
+functions = ('g_r', 'c_r', 'e_r', 'h_k')
+
+
+@pytest.fixture(scope='module')
+def lj():
+    lj = oz.System(kT=1.5)
+    lj.set_interaction(0, 0, oz.lennard_jones(lj.r, eps=1, sig=1))
+    lj.solve(rhos=0.6, mix_param=0.5)
+    return lj
+
+
+def test_lossless(lj, tmpdir):
+    path = str(tmpdir.join('lj.npz'))
+    oz.save_archive(path, lj, functions=functions, tail_tol=1e-12)
+    archive = oz.load_archive(path)
+    for name in functions:
+        assert archive[name].shape == getattr(lj, name).shape
+        assert np.allclose(archive[name], getattr(lj, name), rtol=0,
+                           atol=1e-12)
+    assert np.array_equal(archive['r'], lj.r)
+    assert np.allclose(archive['k'], lj.k)
+    assert archive['kT'] == 1.5
+    assert np.array_equal(archive['rhos'], [0.6])
+
+
+def test_quantized(lj, tmpdir):
+    path = str(tmpdir.join('lj.npz'))
+    oz.save_archive(path, lj, functions=functions, precision=1e-6)
+    archive = oz.load_archive(path)
+    for name in functions:
+        assert np.abs(archive[name] - getattr(lj, name)).max() <= 1e-6
+
+    size = sum(getattr(lj, name).nbytes for name in functions)
+    assert size / tmpdir.join('lj.npz').size() > 10
+
+    with pytest.raises(PyozError):
+        oz.save_archive(path, lj, functions=('S_k',))
+    with pytest.raises(PyozError):
+        oz.save_archive(path, lj, precision=0)
+    with pytest.raises(PyozError):
+        oz.save_archive(path, oz.System())
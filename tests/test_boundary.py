@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+import pyoz as oz
+from pyoz.exceptions import PyozError
+
+
+@pytest.mark.parametrize('backend', ['serial', 'process'])
+def test_trace_boundary(backend, build_lj):
+    line = oz.trace_boundary(build_lj, 'kT', [1.0, 1.2], 'rho', (0.01, 0.4),
+                             tol=1e-3, backend=backend, method='nk')
+    assert np.array_equal(line['kT'], [1.0, 1.2])
+    assert (line['upper'] > line['lower']).all()
+    assert (line['upper'] - line['lower'] <= 1e-3).all()
+    # The region without solutions shrinks with temperature.
+    assert line['lower'][1] > line['lower'][0] + 0.02
+    assert (line['n_solves'] < 20).all()
+
+    lj, rho = build_lj(1.2, line['upper'][1])
+    lj.solve(rho, method='nk', initial_e_r=build_lj(1.2, 0)[0].solve(
+        line['lower'][1], method='nk')[2])
+    assert not lj.solve_info['converged']
+
+
+@pytest.mark.parametrize('criterion', [None, oz.stability])
+def test_bisection(build_lj, criterion):
+    solved = []
+
+    def build(kT, rho):
+        solved.append(rho)
+        return build_lj(kT, rho)
+
+    line = oz.trace_boundary(build, 'kT', [1.2], 'rho', (0.01, 0.4),
+                             tol=1e-3, backend='serial', method='nk',
+                             criterion=criterion)
+    # No density is solved twice and the boundary is a proper interval.
+    solved = np.sort(solved)
+    assert (np.diff(solved) > 1e-9).all()
+    assert 0 < line['upper'][0] - line['lower'][0] <= 1e-3
+
+
+def test_no_boundary(build_lj):
+    line = oz.trace_boundary(build_lj, 'kT', [1.2], 'rho', (0.01, 0.05),
+                             backend='serial', method='nk', criterion=None)
+    assert np.isnan(line['lower']).all() and np.isnan(line['upper']).all()
+    assert line['n_solves'][0] == 9
+
+    with pytest.raises(PyozError):
+        oz.trace_boundary(build_lj, 'kT', [], 'rho', (0.01, 0.05))
+    with pytest.raises(PyozError):
+        oz.trace_boundary(build_lj, 'kT', [1.2], 'rho', (0.01, 0.05),
+                          backend='dask')
+
+
+def test_stability(build_lj):
+    lj, rho = build_lj(1.2, 0)
+    lj.solve(0.05, method='nk')
+    dilute = oz.stability(lj)
+    lj.solve(0.11, method='nk')
+    assert 0 < oz.stability(lj) < dilute < 1
@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+import pytest
+
+import pyoz as oz
+from pyoz.exceptions import PyozError
+
+
+def test_cache_hit(tmpdir, lj_system):
+    cache = oz.SolutionCache(str(tmpdir))
+    lj = lj_system()
+    g_r, c_r, e_r, H_k = lj.solve(rhos=0.6, mix_param=0.5, cache=cache)
+    assert lj.solve_info.reason == 'converged'
+    assert len(cache) == 1
+
+    lj = lj_system()
+    results = lj.solve(rhos=0.6, cache=str(tmpdir))
+    assert lj.solve_info.reason == 'cached'
+    assert lj.solve_info['converged']
+    for array, cached in zip((g_r, c_r, e_r, H_k), results):
+        assert np.array_equal(array, cached)
+    assert np.array_equal(lj.g_r, g_r)
+
+    # Different state points miss.
+    lj.solve(rhos=0.5, mix_param=0.5, cache=cache)
+    assert lj.solve_info.reason == 'converged'
+    lj_system(kT=2.5).solve(rhos=0.6, mix_param=0.5, cache=cache)
+    assert len(cache) == 3
+
+
+def test_cache_skips_unconverged(tmpdir, lj_system):
+    cache = oz.SolutionCache(str(tmpdir))
+    lj = lj_system()
+    lj.solve(rhos=0.6, max_iter=5, cache=cache)
+    assert len(cache) == 0
+
+
+def test_cache_eviction(tmpdir, lj_system):
+    cache = oz.SolutionCache(str(tmpdir))
+    arrays = [np.random.rand(2, 2, 100) for _ in range(3)]
+    for n in range(3):
+        cache.put('key{}'.format(n), *arrays)
+        os.utime(cache._path('key{}'.format(n)), (n, n))
+    size = os.path.getsize(cache._path('key0'))
+
+    # Reading refreshes the access time.
+    assert cache.get('key0') is not None
+    cache.evict(2 * size)
+    assert len(cache) == 2
+    assert cache.get('key1') is None
+    assert np.array_equal(cache.get('key2')[0], arrays[0])
+
+    cache.clear()
+    assert len(cache) == 0
+
+    with pytest.raises(PyozError):
+        lj_system().solve(rhos=0.6, cache=1)
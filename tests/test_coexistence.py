@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+import pyoz as oz
+from pyoz.exceptions import PyozError
+
+
+def build_tail(kT, rho):
+    # A steep core with a long ranged attraction; the hypernetted chain
+    # closure has solutions on both sides of its binodal at low temperature.
+    fluid = oz.System(kT=kT, n_points_exp=10)
+    fluid.set_interaction(0, 0, 4 * fluid.r**-12
+                          - 0.3 * np.exp(-(fluid.r / 2)**2))
+    return fluid, rho
+
+
+def test_binodal():
+    line = oz.binodal(build_tail, [0.40, 0.42], densities=(0.015, 0.4),
+                      method='nk')
+    assert np.allclose(line['rho_vapor'], [0.00929, 0.01231], rtol=1e-3)
+    assert np.allclose(line['rho_liquid'], [0.3259, 0.3082], rtol=1e-3)
+    assert (line['n_solves'] <= 20).all()
+
+    # Pressure and chemical potential of the liquid agree with the vapor.
+    kT, rho = 0.42, line['rho_liquid'][1]
+    fluid = build_tail(kT, rho)[0]
+    oz.continuation(fluid, [0.4, rho], update=lambda rho: rho, method='nk')
+    assert np.isclose(oz.pressure_virial(fluid), line['pressure'][1],
+                      rtol=1e-4)
+    mu = kT * np.log(rho) + oz.excess_chemical_potential(fluid)[0]
+    assert np.isclose(mu, line['mu'][1], rtol=1e-4)
+
+
+def test_no_coexistence():
+    line = oz.binodal(build_tail, [1.0], densities=(0.015, 0.4),
+                      method='nk')
+    assert np.isnan(line['rho_vapor']).all()
+    assert np.isnan(line['rho_liquid']).all()
+
+    with pytest.raises(PyozError):
+        oz.binodal(build_tail, [], densities=(0.015, 0.4))
+    with pytest.raises(PyozError):
+        oz.binodal(build_tail, [0.4], densities=(0.4, 0.015))
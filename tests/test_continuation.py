@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+import pyoz as oz
+from pyoz.exceptions import PyozError
+
+
+def test_density_path():
+    lj = oz.System(kT=1.5)
+    lj.set_interaction(0, 0, oz.lennard_jones(lj.r, eps=1, sig=1))
+    assert np.isnan(lj.solve(rhos=0.95, mix_param=0.5, method='nk')[0]).all()
+    g_r_reference = lj.solve(rhos=0.95, mix_param=0.3, max_iter=5000)[0]
+
+    values = [0.1, 0.5, 0.95]
+    results = oz.continuation(lj, values, update=lambda rho: rho, step=0.1,
+                              mix_param=0.5, method='nk')
+    assert len(results) == 3
+    assert not np.isnan(results[1][0]).any()
+    assert np.allclose(results[2][0], g_r_reference, atol=1e-6)
+    assert lj.solve_info['n_iter'] < 10
+
+
+def test_temperature_path():
+    lj = oz.System()
+    lj.set_interaction(0, 0, oz.lennard_jones(lj.r, eps=1, sig=1))
+
+    def set_kT(kT):
+        lj.kT = kT
+        return 0.5
+
+    g_r = oz.continuation(lj, [2.0, 1.5], update=set_kT, step=0.1,
+                          mix_param=0.5)[-1][0]
+    reference = oz.System(kT=1.5)
+    reference.U_r = lj.U_r
+    assert np.allclose(g_r, reference.solve(rhos=0.5, mix_param=0.5)[0],
+                       atol=1e-6)
+
+
+def test_abandoned_path():
+    lj = oz.System()
+    lj.set_interaction(0, 0, oz.lennard_jones(lj.r, eps=1, sig=1))
+    results = oz.continuation(lj, [0.01, 10], update=lambda rho: rho,
+                              min_step=1, mix_param=0.5, max_iter=200)
+    assert not np.isnan(results[0][0]).any()
+    assert np.isnan(results[1][0]).all()
+
+    with pytest.raises(PyozError):
+        oz.continuation(lj, [], update=lambda rho: rho)
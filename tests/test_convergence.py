@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+import pyoz as oz
+
+
+@pytest.mark.parametrize('method', ['fixed-point', 'newton-krylov', 'gillan'])
+def test_record(method, lj_system):
+    lj = lj_system()
+    lj.solve(rhos=0.6, mix_param=0.5, method=method)
+    record = lj.solve_info
+    assert isinstance(record, oz.ConvergenceRecord)
+    assert record.converged and record['converged']
+    assert record.reason == 'converged'
+    assert record.residuals[-1] < 1e-9
+    assert len(record.residuals) == len(record.step_times)
+    assert len(record.residuals) == len(record.mix_params)
+    assert (record.step_times >= 0).all()
+    if method == 'fixed-point':
+        assert len(record.residuals) == record.n_iter
+        assert (record.mix_params == 0.5).all()
+
+
+def test_record_divergence(lj_system):
+    lj = lj_system(kT=1.2)
+    lj.solve(rhos=0.75, mix_param=0.8)
+    assert lj.solve_info.reason == 'diverged'
+
+    lj.solve(rhos=0.75, mix_param=0.3, max_iter=10)
+    assert lj.solve_info.reason == 'max_iter'
+    assert not lj.solve_info.converged
+
+
+def test_callback_stops(lj_system):
+    lj = lj_system()
+    seen = []
+
+    def callback(record, e_r):
+        seen.append(record.residuals[-1])
+        assert e_r.shape == lj.U_r.shape
+        return record.n_iter >= 4
+
+    g_r = lj.solve(rhos=0.6, mix_param=0.5, callback=callback)[0]
+    assert np.isnan(g_r).all()
+    assert lj.solve_info.reason == 'callback'
+    assert len(seen) == 4
+
+
+def test_record_precision_stages(lj_system):
+    lj = lj_system(precision='mixed')
+    lj.solve(rhos=0.6, mix_param=0.5)
+    record = lj.solve_info
+    assert record.converged
+    assert len(record.residuals) == record.n_iter
+    assert record.residuals.max() > 1e-5 > record.residuals[-1]
+
+
+def test_callback_stops_mixed_precision(lj_system):
+    lj = lj_system(precision='mixed')
+    dtypes = []
+
+    def callback(record, e_r):
+        dtypes.append(e_r.dtype)
+        return True
+
+    g_r = lj.solve(rhos=0.6, mix_param=0.5, callback=callback)[0]
+    assert np.isnan(g_r).all()
+    assert lj.solve_info.reason == 'callback'
+    assert lj.solve_info.n_iter == 1
+    assert dtypes == [np.float32]
+
+
+def test_mixed_precision_plateau(lj_system):
+    # Single precision cannot reach `mixed_precision_tol`, so the switch to
+    # double precision happens once the residual stops decreasing.
+    lj = lj_system(precision='mixed', mixed_precision_tol=1e-12)
+    dtypes = []
+
+    def callback(record, e_r):
+        dtypes.append(e_r.dtype)
+
+    lj.solve(rhos=0.6, mix_param=0.5, max_iter=1000, callback=callback)
+    assert lj.solve_info.converged
+    assert dtypes.count(np.float32) < 500
+    assert lj.solve_info.residuals[-1] < 1e-9
+
+    lj.solve_batch(rhos=[0.6], mix_param=0.5, max_iter=1000)
+    assert lj.solve_info['converged'].all()
+    assert lj.solve_info['n_iter'][0] < 1000
+
+    record = oz.ConvergenceRecord()
+    for residual in [1, 0.5, 0.6, 0.7]:
+        record.log(residual, 0)
+    assert record.stalled(2) and not record.stalled(3)
+
+
+def test_batch_record(lj_system):
+    lj = lj_system()
+    lj.solve_batch(rhos=[0.5, 0.6, 10], mix_param=0.5, max_iter=500)
+    record = lj.solve_info
+    assert isinstance(record, oz.BatchRecord)
+    assert list(record.converged) == [True, True, False]
+    assert list(record['converged']) == [True, True, False]
+    assert record.reason[:2].tolist() == ['converged', 'converged']
+    assert record.reason[2] in ('diverged', 'max_iter')
+    assert isinstance(record[1], oz.ConvergenceRecord)
+    assert len(record[1].residuals) == record['n_iter'][1]
+    assert record[1].residuals[-1] < 1e-9
+    assert (record[1].mix_params == 0.5).all()
+
+    solvent = lj_system()
+    solvent.solve(rhos=0.6, mix_param=0.5)
+    U_r = oz.lennard_jones(solvent.r, eps=0.5, sig=1.5)[np.newaxis]
+    solvent.solve_solutes(U_r, mix_param=0.5)
+    record = solvent.solute_info
+    assert isinstance(record, oz.BatchRecord) and len(record) == 1
+    assert record[0].reason == 'converged'
+    assert record.residuals[0][-1] < 1e-9
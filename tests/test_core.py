@@ -124,6 +124,55 @@ def test_one_inf_dilute(one_component_lj, two_component_one_inf_dilute_lj):
     assert not np.any(two.h_k[1, 1])
 
 
+def test_infinite_dilution(one_component_lj, two_component_one_inf_dilute_lj):
+    one = one_component_lj
+    lj = oz.System(kT=one.kT)
+    lj.U_r = two_component_one_inf_dilute_lj.U_r
+    rhos = np.diag(two_component_one_inf_dilute_lj.rho_ij)
+    g_r, _, _, h_k = lj.solve(rhos=rhos, infinite_dilution=True)
+    assert lj.solve_info['converged']
+    assert np.allclose(g_r[0, 0], one.g_r[0, 0])
+    assert np.allclose(h_k[0, 0], one.h_k[0, 0])
+    assert not np.any(h_k[0, 1]) and not np.any(h_k[1, 1])
+
+    # The limit of vanishing solute density.
+    dilute = oz.System(kT=one.kT)
+    dilute.U_r = lj.U_r
+    reference = dilute.solve(rhos=[rhos[0], 1e-9])[0]
+    assert np.allclose(g_r, reference, atol=1e-6)
+    assert not np.allclose(g_r[0, 1], np.exp(-lj.U_r[0, 1]), atol=1e-3)
+
+    with pytest.raises(PyozError):
+        lj.solve(rhos=rhos, infinite_dilution=True, closure_name='RHNC',
+                 reference_system=one)
+
+
+def test_solve_solutes(two_component_one_inf_dilute_lj):
+    two = two_component_one_inf_dilute_lj
+    solvent = oz.System(kT=two.kT)
+    with pytest.raises(PyozError):
+        solvent.solve_solutes(two.U_r[1, :1])
+    solvent.set_interaction(0, 0, two.U_r[0, 0])
+    solvent.solve(rhos=0.05)
+
+    U_r = np.array([oz.lennard_jones(solvent.r, eps=eps, sig=1.5)[np.newaxis]
+                    for eps in (0.5, 0.75, 1.0)])
+    g_r = solvent.solve_solutes(U_r)[0]
+    assert g_r.shape == (3, 1, solvent.n_pts)
+    assert solvent.solute_info['converged'].all()
+
+    lj = oz.System(kT=two.kT)
+    lj.set_interaction(0, 0, solvent.U_r[0, 0])
+    lj.set_interaction(1, 1, two.U_r[1, 1])
+    lj.set_interaction(0, 1, U_r[1, 0])
+    g_r_pair = lj.solve(rhos=[0.05, 0], infinite_dilution=True)[0]
+    assert np.allclose(g_r[1, 0], g_r_pair[1, 0])
+    assert not np.allclose(g_r[0], g_r[2])
+
+    with pytest.raises(PyozError):
+        solvent.solve_solutes(U_r[:, :, :10])
+
+
 def test_solve_with_reference():
     eps = 1
     sig = 1
@@ -150,3 +199,99 @@ def test_unconverged():
     assert np.isnan(e_r).all()
     assert np.isnan(h_k).all()
 
+
+def test_solve_batch():
+    lj = oz.System()
+    lj.set_interaction(0, 0, oz.lennard_jones(lj.r, 1, 1))
+
+    rhos = [0.01, 0.1, 10]
+    kTs = [1, 1.5, 1]
+    g_r, c_r, e_r, h_k = lj.solve_batch(rhos=rhos, kT=kTs)
+    assert g_r.shape == (3,) + lj.U_r.shape
+    assert list(lj.solve_info['converged']) == [True, True, False]
+    assert np.isnan(g_r[2]).all()
+
+    for n, (rho, kT) in enumerate(zip(rhos[:2], kTs[:2])):
+        lj.kT = kT
+        results = lj.solve(rhos=rho)
+        for array, batch_array in zip(results, (g_r, c_r, e_r, h_k)):
+            assert np.allclose(array, batch_array[n])
+
+
+def test_solve_batch_multi_component(two_component_lj,
+                                     two_component_one_inf_dilute_lj):
+    two = two_component_lj
+    dilute = two_component_one_inf_dilute_lj
+    lj = oz.System(kT=two.kT)
+    lj.U_r = two.U_r
+
+    rhos = [np.diag(two.rho_ij), np.diag(dilute.rho_ij)]
+    g_r, _, _, h_k = lj.solve_batch(rhos=rhos)
+    assert np.allclose(g_r[0], two.g_r)
+    assert np.allclose(h_k[0], two.h_k)
+    assert np.allclose(g_r[1], dilute.g_r)
+    assert np.allclose(h_k[1], dilute.h_k)
+
+    with pytest.raises(PyozError):
+        lj.solve_batch(rhos=[0.1, 0.2])
+
+    with pytest.raises(PyozError):
+        lj.solve_batch(rhos=rhos, closure_name='RHNC')
+    with pytest.raises(PyozError):
+        lj.solve_batch(rhos=rhos, initial_e_r=two.e_r)
+
+
+def test_precision():
+    results = dict()
+    for precision in ['double', 'single', 'mixed']:
+        lj = oz.System(kT=2, precision=precision)
+        lj.set_interaction(0, 0, oz.lennard_jones(lj.r, 1, 1))
+        tol = 1e-5 if precision == 'single' else 1e-9
+        results[precision] = lj.solve(rhos=0.6, mix_param=0.5, tol=tol)[0]
+        assert lj.solve_info['converged']
+
+    assert results['single'].dtype == np.float32
+    single = oz.System(kT=2, precision='single')
+    single.set_interaction(0, 0, oz.lennard_jones(single.r, 1, 1))
+    for method in ['newton-krylov', 'gillan']:
+        H_k = single.solve(rhos=0.6, mix_param=0.5, tol=1e-5,
+                           method=method)[3]
+        assert H_k.dtype == np.float32
+    assert np.allclose(results['single'], results['double'], atol=1e-3)
+    assert results['mixed'].dtype == np.float64
+    assert np.allclose(results['mixed'], results['double'], atol=1e-8)
+
+    lj.precision = 'mixed'
+    g_r = lj.solve_batch(rhos=[0.6], mix_param=0.5)[0]
+    assert np.allclose(g_r[0], results['double'], atol=1e-8)
+
+    with pytest.raises(PyozError):
+        oz.System(precision='half')
+
+
+@pytest.mark.parametrize('kT, rho', [(2, 0.6), (1.5, 0.2)])
+def test_cholesky_solver(lj_system, kT, rho):
+    lj = lj_system(kT=kT)
+    g_r, _, _, H_k = lj.solve(rhos=rho, mix_param=0.5)
+    g_r_cholesky, _, _, H_k_cholesky = lj.solve(rhos=rho, mix_param=0.5,
+                                                linear_solver='cholesky')
+    assert lj.solve_info['converged']
+    assert np.allclose(g_r_cholesky, g_r, atol=1e-8)
+    assert np.allclose(H_k_cholesky, H_k, atol=1e-8)
+
+    lj.solve(rhos=rho, mix_param=0.5, linear_solver='cholesky',
+             multigrid_levels=2)
+    assert lj.solve_info['converged']
+
+
+def test_multigrid():
+    lj = oz.System(kT=2, n_points_exp=13)
+    lj.set_interaction(0, 0, oz.lennard_jones(lj.r, 1, 1))
+    g_r = lj.solve(rhos=0.6, mix_param=0.5)[0]
+    n_iter = lj.solve_info['n_iter']
+
+    g_r_multigrid = lj.solve(rhos=0.6, mix_param=0.5, multigrid_levels=2)[0]
+    assert np.allclose(g_r_multigrid, g_r, atol=1e-6)
+    assert lj.solve_info['n_iter'] < n_iter
+    assert lj.solve_info['coarse']['converged']
+    assert 'coarse' in lj.solve_info['coarse']
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+import pyoz as oz
+from pyoz.exceptions import PyozError
+
+
+def test_newton_krylov_matches_fixed_point(lj_system):
+    lj = lj_system()
+    g_r_picard = lj.solve(rhos=0.6, mix_param=0.5, max_iter=5000)[0]
+    n_iter_picard = lj.solve_info['n_iter']
+
+    g_r = lj.solve(rhos=0.6, method='newton-krylov')[0]
+    assert lj.solve_info['converged']
+    assert lj.solve_info['n_iter'] < n_iter_picard
+    assert lj.solve_info['n_linear_iter'] > 0
+    assert np.allclose(g_r, g_r_picard, atol=1e-6)
+
+
+def test_newton_krylov_two_component(two_component_lj):
+    two = two_component_lj
+    lj = oz.System(kT=two.kT)
+    lj.U_r = two.U_r
+    g_r, _, _, H_k = lj.solve(rhos=np.diag(two.rho_ij), method='nk',
+                              method_options={'inner_maxiter': 20})
+    assert np.allclose(g_r, two.g_r, atol=1e-6)
+    assert np.allclose(H_k, two.h_k, atol=1e-6)
+
+
+def test_newton_krylov_unconverged(lj_system):
+    lj = lj_system()
+    g_r = lj.solve(rhos=10, method='newton-krylov')[0]
+    assert np.isnan(g_r).all()
+    assert not lj.solve_info['converged']
+
+
+def test_unsupported_method(lj_system):
+    lj = lj_system()
+    with pytest.raises(PyozError):
+        lj.solve(rhos=0.6, method='foobar')
+
+
+@pytest.mark.parametrize('closure_name', ['hnc', 'py'])
+def test_gillan_matches_fixed_point(closure_name, lj_system):
+    lj = lj_system()
+    g_r_picard = lj.solve(rhos=0.6, closure_name=closure_name, mix_param=0.5,
+                          max_iter=5000)[0]
+    n_iter_picard = lj.solve_info['n_iter']
+
+    g_r = lj.solve(rhos=0.6, closure_name=closure_name, method='gillan')[0]
+    assert lj.solve_info['converged']
+    assert lj.solve_info['n_iter'] < n_iter_picard
+    assert np.allclose(g_r, g_r_picard, atol=1e-6)
+
+
+def test_gillan_two_component(two_component_lj):
+    two = two_component_lj
+    lj = oz.System(kT=two.kT)
+    lj.U_r = two.U_r
+    g_r = lj.solve(rhos=np.diag(two.rho_ij), method='gillan',
+                   method_options={'n_basis': 10})[0]
+    assert np.allclose(g_r, two.g_r, atol=1e-6)
+
+
+def test_gillan_basis_too_large(lj_system):
+    lj = lj_system()
+    with pytest.raises(PyozError):
+        lj.solve(rhos=0.6, method='gillan',
+                 method_options={'n_basis': lj.n_pts, 'node_spacing': 1})
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from scipy.fftpack import dst
+
+import pyoz as oz
+from pyoz.exceptions import PyozError
+from pyoz.fft import make_fft_backend
+
+
+@pytest.mark.parametrize('backend', ['scipy', 'numpy', 'fftw',
+                                     oz.ScipyBackend(workers=2)])
+def test_backend_matches_fftpack(backend):
+    if backend == 'fftw':
+        pytest.importorskip('pyfftw')
+    backend = make_fft_backend(backend)
+    x = np.random.uniform(-1, 1, size=(3, 63))
+    assert np.allclose(backend.dst(x), dst(x, type=1))
+
+    y = x.copy()
+    assert np.allclose(backend.dst(y, overwrite_x=True), dst(x, type=1))
+
+
+def test_system_backend():
+    lj = oz.System(kT=2)
+    lj.set_interaction(0, 0, oz.lennard_jones(lj.r, eps=1, sig=1))
+    g_r = lj.solve(rhos=0.6, mix_param=0.5)[0]
+
+    lj_numpy = oz.System(kT=2, fft_backend='numpy')
+    lj_numpy.U_r = lj.U_r
+    assert isinstance(lj_numpy.fft_backend, oz.NumpyBackend)
+    assert np.allclose(lj_numpy.solve(rhos=0.6, mix_param=0.5)[0], g_r)
+
+
+def test_global_backend():
+    default = oz.get_fft_backend()
+    try:
+        oz.set_fft_backend('numpy')
+        assert isinstance(oz.get_fft_backend(), oz.NumpyBackend)
+        with pytest.raises(PyozError):
+            oz.set_fft_backend('foobar')
+    finally:
+        oz.set_fft_backend(default)
+    assert oz.get_fft_backend() is default
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import pyoz as oz
+from pyoz.exceptions import PyozError
+
+
+@pytest.mark.parametrize('scheme', ['anderson', 'diis', 'ng',
+                                    oz.Anderson(n_history=10)])
+def test_accelerated_schemes_match_picard(scheme, lj_system):
+    g_r_picard = lj_system().solve(rhos=0.6, mix_param=0.5,
+                                   max_iter=5000)[0]
+
+    lj = lj_system()
+    g_r = lj.solve(rhos=0.6, mix_param=0.5, iteration_scheme=scheme)[0]
+    assert not np.isnan(g_r).any()
+    assert np.allclose(g_r, g_r_picard, atol=1e-6)
+
+
+def test_unsupported_scheme(lj_system):
+    with pytest.raises(PyozError):
+        lj_system().solve(rhos=0.6, iteration_scheme='foobar')
+
+    with pytest.raises(PyozError):
+        oz.Anderson(n_history=0)
+
+
+def test_scheme_mix_param():
+    scheme = oz.Picard()
+    scheme.reset(0.3)
+    assert scheme.mix == 0.3
+
+    scheme = oz.Picard(mix_param=0.7)
+    scheme.reset(0.3)
+    assert scheme.mix == 0.7
+
+
+def test_adaptive_recovers_from_divergence(lj_system):
+    lj = lj_system(kT=1.2)
+    g_r = lj.solve(rhos=0.75, mix_param=0.8)[0]
+    assert np.isnan(g_r).all()
+
+    g_r_reference = lj.solve(rhos=0.75, mix_param=0.3, max_iter=5000)[0]
+    g_r = lj.solve(rhos=0.75, mix_param=0.8, iteration_scheme='adaptive')[0]
+    assert lj.solve_info['converged']
+    assert np.allclose(g_r, g_r_reference, atol=1e-6)
+
+
+def test_adaptive_gives_up(lj_system):
+    lj = lj_system(kT=1)
+    scheme = oz.AdaptivePicard(max_recoveries=3)
+    g_r = lj.solve(rhos=10, iteration_scheme=scheme)[0]
+    assert np.isnan(g_r).all()
+    assert not lj.solve_info['converged']
+    assert scheme.n_recoveries <= 3
+
+
+def test_adaptive_reuses_best_state():
+    scheme = oz.AdaptivePicard()
+    scheme.reset(0.5)
+    assert scheme.recover() is None
+
+    e_r_previous = np.zeros((1, 1, 10))
+    scheme(np.ones((1, 1, 10)), e_r_previous)
+    best = scheme._best
+    e_r_previous = np.full((1, 1, 10), 0.9)
+    scheme(np.ones((1, 1, 10)), e_r_previous)
+    assert scheme._best is best
+    assert np.array_equal(best[1], np.full((1, 1, 10), 0.9))
+    assert scheme.recover() is not None
+
+    scheme.reset(0.5)
+    assert scheme.recover() is None
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pytest
+
+from pyoz.exceptions import PyozError
+from pyoz.misc import atomic_savez, solver
+
+
+def random_oz_problem(shape):
+    """Return A = I - C and B = C for a symmetric, small C. """
+    C = np.random.uniform(-0.1, 0.1, size=shape)
+    C = (C + np.swapaxes(C, -2, -3)) / 2
+    A = np.eye(shape[-2])[:, :, np.newaxis] - C
+    return A, C
+
+
+@pytest.mark.parametrize('shape', [(1, 1, 20), (2, 2, 20), (3, 3, 20),
+                                   (4, 2, 2, 20), (4, 3, 3, 20)])
+def test_solver(shape):
+    A, B = random_oz_problem(shape)
+    H_k = solver(A, B)
+    reference = np.linalg.solve(np.moveaxis(A, -1, -3),
+                                np.moveaxis(B, -1, -3))
+    assert np.allclose(H_k, np.moveaxis(reference, -3, -1))
+
+    out = np.empty(shape)
+    assert solver(A, B, out=out) is out
+    assert np.allclose(out, H_k)
+
+    assert np.allclose(solver(A, B, method='cholesky'), H_k)
+
+    A, B = A.astype(np.float32), B.astype(np.float32)
+    for method in ['lu', 'cholesky']:
+        assert solver(A, B, method=method).dtype == np.float32
+
+
+@pytest.mark.parametrize('n_components', [1, 2, 3])
+def test_solver_cholesky_fallback(n_components):
+    # Points where A = I - C is not positive definite are solved with LU.
+    A, B = random_oz_problem((n_components, n_components, 20))
+    B[..., ::3] += 2 * np.eye(n_components)[:, :, np.newaxis]
+    A[..., ::3] -= 2 * np.eye(n_components)[:, :, np.newaxis]
+    assert np.allclose(solver(A, B, method='cholesky'), solver(A, B))
+
+
+def test_solver_errors():
+    A, B = random_oz_problem((2, 2, 20))
+    with pytest.raises(PyozError):
+        solver(A, B, method='foobar')
+    with pytest.raises(PyozError):
+        solver(np.zeros_like(A), B)
+    with pytest.raises(PyozError):
+        solver(np.zeros_like(A), B, method='cholesky')
+
+
+@pytest.mark.parametrize('compressed', [False, True])
+def test_atomic_savez(tmpdir, compressed):
+    path = str(tmpdir.join('arrays.npz'))
+    atomic_savez(path, compressed=compressed, a=np.arange(5))
+    atomic_savez(path, compressed=compressed, a=np.arange(3))
+    with np.load(path) as data:
+        assert np.array_equal(data['a'], np.arange(3))
+    assert os.listdir(str(tmpdir)) == ['arrays.npz']
@@ -0,0 +1,62 @@
+import time
+
+import numpy as np
+
+import pyoz as oz
+from pyoz.profiler import phase
+
+
+def test_solve_profile(lj_system):
+    lj = lj_system()
+    lj.solve(rhos=0.6, mix_param=0.5, profile=True)
+    report = lj.solve_profile.report()
+    n_iter = lj.solve_info['n_iter']
+    for name in ['closure', 'forward transform', 'k-space solve',
+                 'inverse transform', 'convergence test']:
+        assert report[name]['calls'] == n_iter
+        assert report[name]['time'] > 0
+        assert report[name]['peak_memory'] is None
+    assert report['mixing']['calls'] == n_iter - 1
+    assert 'closure' in str(lj.solve_profile)
+
+
+def test_profile_context(lj_system):
+    lj = lj_system()
+    with oz.profile(track_memory=True) as profiler:
+        lj.solve(rhos=0.5, mix_param=0.5)
+        n_iter = lj.solve_info['n_iter']
+        lj.solve(rhos=0.6, mix_param=0.5)
+        n_iter += lj.solve_info['n_iter']
+    report = profiler.report()
+    assert report['closure']['calls'] == n_iter
+    assert report['closure']['peak_memory'] >= 0
+
+    lj.solve(rhos=0.6, mix_param=0.5)
+    assert profiler.report()['closure']['calls'] == n_iter
+
+
+def test_nested_phases():
+    with oz.profile(track_memory=True) as profiler:
+        start = time.perf_counter()
+        with phase('outer'):
+            np.ones(10**6)
+            with phase('inner'):
+                time.sleep(0.05)
+                np.ones(10**3)
+        elapsed = time.perf_counter() - start
+    report = profiler.report()
+    assert report['inner']['time'] >= 0.05
+    assert report['outer']['time'] < 0.05
+    assert report['outer']['time'] + report['inner']['time'] <= elapsed
+    assert report['inner']['peak_memory'] < 10**6
+    assert report['outer']['peak_memory'] >= 8 * 10**6
+
+
+def test_newton_krylov_profile(lj_system):
+    lj = lj_system()
+    start = time.perf_counter()
+    lj.solve(rhos=0.6, method='newton-krylov', profile=True)
+    elapsed = time.perf_counter() - start
+    report = lj.solve_profile.report()
+    assert report['krylov solve']['calls'] > 0
+    assert sum(entry['time'] for entry in report.values()) <= elapsed
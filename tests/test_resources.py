@@ -0,0 +1,53 @@
+import pytest
+
+import pyoz as oz
+from pyoz.exceptions import PyozError
+from pyoz.resources import PROCESS_OVERHEAD, available_memory
+
+
+def test_estimate_solve():
+    small = oz.estimate_solve(1, 2**12)
+    large = oz.estimate_solve(10, 2**16)
+    assert large.memory > 1000 * small.memory
+    assert large.flops > 1000 * small.flops
+    assert oz.estimate_solve(1, 2**12, batch_size=4).memory == 4 * small.memory
+    assert oz.estimate_solve(1, 2**12, precision='single').memory < \
+        small.memory
+
+    assert oz.estimate_solve(1, 2**12, method='nk').memory > small.memory
+    assert oz.estimate_solve(1, 2**12, iteration_scheme='anderson').memory > \
+        small.memory
+    assert oz.estimate_solve(1, 2**12,
+                             iteration_scheme=oz.Anderson(10)).memory > \
+        oz.estimate_solve(1, 2**12, iteration_scheme=oz.Anderson(2)).memory
+
+    # The actual arrays of a solve are within the estimate.
+    lj = oz.System(kT=2)
+    lj.set_interaction(0, 0, oz.lennard_jones(lj.r, eps=1, sig=1))
+    lj.solve(rhos=0.5, mix_param=0.5)
+    assert 5 * lj.g_r.nbytes < small.memory
+
+    with pytest.raises(PyozError):
+        oz.estimate_solve(1, 2**12, method='magic')
+    with pytest.raises(PyozError):
+        oz.estimate_solve(1, 2**12, iteration_scheme='magic')
+
+
+def test_plan_workers():
+    small = oz.estimate_solve(1, 2**12)
+    assert oz.plan_workers(small, cpus=8) == (8, 1)
+    assert oz.plan_workers(small, n_tasks=3, cpus=8) == (3, 1)
+
+    large = oz.estimate_solve(10, 2**16)
+    budget = 2.5 * (large.memory + PROCESS_OVERHEAD)
+    assert oz.plan_workers(large, memory_budget=budget, cpus=8) == (2, 4)
+    assert oz.plan_workers(large, memory_budget=4 * budget, cpus=32,
+                           max_processes=4) == (4, 8)
+    assert oz.plan_workers(small, cpus=32, max_processes=4) == (4, 1)
+    with pytest.raises(PyozError):
+        oz.plan_workers(large, memory_budget=large.memory / 2)
+
+    processes, threads = oz.plan_workers(small)
+    assert processes >= 1 and threads >= 1
+    memory = available_memory()
+    assert memory is None or memory > 0
@@ -0,0 +1,94 @@
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+import pyoz as oz
+from pyoz.exceptions import PyozError
+
+
+def build_lj_shared(kT, rho, U_r, e_r):
+    lj = oz.System(kT=kT, n_points_exp=10)
+    lj.U_r = U_r
+    return lj, rho, {'initial_e_r': e_r}
+
+
+def height(system):
+    return system.g_r.max()
+
+
+axes = OrderedDict([('kT', [1.5, 2.0]), ('rho', [0.2, 0.4, 0.6])])
+
+
+@pytest.mark.parametrize('backend', ['serial', 'process'])
+def test_scan(backend, build_lj):
+    scan = oz.Scan(axes, build_lj, ['pressure_virial', 'g_r', height],
+                   mix_param=0.5)
+    results = scan.run(workers=2, backend=backend)
+    assert results['converged'].all()
+    assert scan.n_completed == 6
+    assert results['pressure_virial'].shape == (2, 3)
+    assert results['g_r'].shape == (2, 3, 1, 1, 1023)
+
+    lj, rho = build_lj(2.0, 0.4)
+    g_r = lj.solve(rho, mix_param=0.5)[0]
+    assert np.allclose(results['g_r'][1, 1], g_r)
+    assert np.isclose(results['height'][1, 1], g_r.max())
+
+
+def test_resume(tmpdir, build_lj):
+    checkpoint = str(tmpdir.join('scan.npz'))
+    scan = oz.Scan(axes, build_lj, ['pressure_virial'], checkpoint=checkpoint,
+                   checkpoint_every=1, mix_param=0.5)
+    # Interrupt the scan after two points.
+    for n, result in enumerate(scan._execute(list(scan.points()),
+                                             (build_lj, scan.properties,
+                                              scan.solve_kwargs, {}),
+                                             None, 'serial', None)):
+        scan._store(*result)
+        if n == 1:
+            break
+    scan.save()
+
+    resumed = oz.Scan(axes, build_lj, ['pressure_virial'],
+                      checkpoint=checkpoint, mix_param=0.5)
+    assert resumed.n_completed == 2
+    assert np.array_equal(resumed.results['pressure_virial'][0, :2],
+                          scan.results['pressure_virial'][0, :2])
+    results = resumed.run(backend='serial')
+    assert resumed.n_completed == 6
+    assert results['converged'].all()
+    assert np.isfinite(results['pressure_virial']).all()
+
+    with pytest.raises(PyozError):
+        oz.Scan(OrderedDict([('kT', [1.0])]), build_lj, [],
+                checkpoint=checkpoint)
+
+
+def test_unconverged(build_lj):
+    scan = oz.Scan(OrderedDict([('kT', [2.0]), ('rho', [0.2, 10])]),
+                   build_lj, ['pressure_virial'], mix_param=0.5, max_iter=200)
+    results = scan.run(backend='serial')
+    assert results['converged'].tolist() == [[True, False]]
+    assert np.isnan(results['pressure_virial'][0, 1])
+
+    with pytest.raises(PyozError):
+        scan.run(backend='threads')
+    with pytest.raises(PyozError):
+        oz.Scan(OrderedDict(), build_lj, [])
+
+
+def test_shared(build_lj):
+    lj, rho = build_lj(2.0, 0.4)
+    e_r = lj.solve(rho, mix_param=0.5)[2]
+    scan = oz.Scan(axes, build_lj_shared, ['g_r', 'pressure_virial'],
+                   shared={'U_r': lj.U_r, 'e_r': e_r}, mix_param=0.5)
+    results = scan.run(workers=2)
+    assert results['converged'].all()
+    assert not isinstance(results['g_r'], np.memmap)
+    assert np.allclose(results['g_r'][1, 1], lj.g_r)
+    # The shared reference solution is the initial guess.
+    assert results['n_iter'][1, 1] == 1
+
+    with pytest.raises(PyozError):
+        oz.Scan(axes, build_lj_shared, [], shared={'kT': [1]})
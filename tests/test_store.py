@@ -0,0 +1,60 @@
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+import pyoz as oz
+from pyoz.exceptions import PyozError
+
+
+axes = OrderedDict([('kT', [1.5, 2.0]), ('rho', [0.2, 0.4])])
+
+
+def test_store(tmpdir):
+    directory = str(tmpdir.join('store'))
+    store = oz.ResultStore(directory, axes)
+    store.write((0, 1), 'g_r', np.ones(5))
+    store.write((0, 1), 'n', 3)
+    store['completed'][0, 1] = True
+    store.flush()
+    assert store['g_r'].shape == (2, 2, 5)
+    assert np.isnan(store['g_r'][1, 1]).all()
+
+    # Partial results can be read while the store is written.
+    reader = oz.ResultStore(directory, mode='r')
+    assert reader.names() == ['completed', 'g_r', 'n']
+    assert np.array_equal(reader['g_r'][reader['completed']], [np.ones(5)])
+    assert reader['n'][0, 1] == 3
+    with pytest.raises(PyozError):
+        reader.write((0, 0), 'g_r', np.ones(5))
+
+    with pytest.raises(PyozError):
+        store.write((0, 0), 'g_r', np.ones(4))
+    with pytest.raises(PyozError):
+        oz.ResultStore(directory, OrderedDict([('kT', [1.5])]))
+    with pytest.raises(PyozError):
+        oz.ResultStore(str(tmpdir.join('missing')), mode='r')
+
+
+def test_scan_store(tmpdir, build_lj):
+    directory = str(tmpdir.join('scan'))
+    scan = oz.Scan(axes, build_lj, ['g_r', 'pressure_virial'],
+                   store=directory, mix_param=0.5)
+    results = scan.run(backend='serial')
+    assert isinstance(results['g_r'], np.memmap)
+    assert results['g_r'].shape == (2, 2, 1, 1, 1023)
+
+    reader = oz.ResultStore(directory, mode='r')
+    assert reader['completed'].all()
+    assert np.array_equal(reader['pressure_virial'],
+                          results['pressure_virial'])
+
+    resumed = oz.Scan(axes, build_lj, ['g_r', 'pressure_virial'],
+                      store=directory, mix_param=0.5)
+    assert resumed.n_completed == 4
+    assert list(resumed.results) == ['converged', 'n_iter', 'g_r',
+                                     'pressure_virial']
+
+    with pytest.raises(PyozError):
+        oz.Scan(axes, build_lj, [], store=directory,
+                checkpoint=str(tmpdir.join('scan.npz')))
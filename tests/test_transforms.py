@@ -0,0 +1,43 @@
+import numpy as np
+from scipy.fftpack import dst
+
+import pyoz as oz
+from pyoz.transforms import SineTransform
+
+
+def random_symmetric(system, n_components):
+    f = np.random.rand(n_components, n_components, system.n_pts)
+    return f + f.transpose(1, 0, 2)
+
+
+def test_matches_pairwise_transform():
+    s = oz.System()
+    rho_ij = np.array([[0.1, 0.05], [0.05, 0.0]])
+    transform = SineTransform(s.r, s.k, s.dr, s.dk, rho_ij)
+    f_r = random_symmetric(s, 2)
+
+    F_k = transform.forward(f_r)
+    f_r_inverse = transform.inverse(F_k)
+    for i, j in np.ndindex(2, 2):
+        constant = 2 * np.pi * rho_ij[i, j] * s.dr / s.k
+        assert np.allclose(F_k[i, j], constant * dst(f_r[i, j] * s.r, type=1))
+        if rho_ij[i, j] == 0:
+            assert not f_r_inverse[i, j].any()
+        else:
+            assert np.allclose(f_r_inverse[i, j], f_r[i, j])
+    assert np.array_equal(F_k[0, 1], F_k[1, 0])
+
+
+def test_batched_transform():
+    s = oz.System()
+    rho_ij = np.array([[[0.1]], [[0.2]], [[0.3]]])
+    transform = SineTransform(s.r, s.k, s.dr, s.dk, rho_ij)
+    f_r = np.random.rand(3, 1, 1, s.n_pts)
+
+    F_k = transform.forward(f_r)
+    for n in range(3):
+        single = SineTransform(s.r, s.k, s.dr, s.dk, rho_ij[n])
+        assert np.allclose(F_k[n], single.forward(f_r[n]))
+
+    subset = transform[[0, 2]]
+    assert np.allclose(subset.forward(f_r[[0, 2]]), F_k[[0, 2]])
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+import pyoz as oz
+from pyoz.exceptions import PyozError
+
+
+def test_warm_start(tmpdir, lj_system):
+    db = oz.WarmStartDB(str(tmpdir))
+    lj = lj_system()
+    lj.solve(rhos=0.6, mix_param=0.5, warm_start=db)
+    n_iter_cold = lj.solve_info['n_iter']
+    assert 'warm_start_distance' not in lj.solve_info
+    assert len(db) == 1
+
+    g_r = lj.solve(rhos=0.62, mix_param=0.5, warm_start=db)[0]
+    assert lj.solve_info['warm_start_distance'] > 0
+    assert lj.solve_info['n_iter'] < n_iter_cold
+    assert np.allclose(g_r, lj_system().solve(rhos=0.62, mix_param=0.5)[0],
+                       atol=1e-6)
+    assert len(db) == 2
+
+    # Entries written by other processes are picked up.
+    other = oz.WarmStartDB(str(tmpdir), n_neighbors=2)
+    e_r, distance = other.nearest(lj, 0.61)
+    assert distance > 0
+    assert np.isfinite(e_r).all()
+
+
+def test_warm_start_params(tmpdir, lj_system):
+    db = oz.WarmStartDB(str(tmpdir))
+    lj = lj_system(eps=1)
+    e_r = lj.solve(rhos=0.6, mix_param=0.5, warm_start=db,
+                   warm_start_params=[1])[2]
+    lj = lj_system(eps=1.1)
+    guess, distance = db.nearest(lj, 0.6, [1.1])
+    assert np.array_equal(guess, e_r)
+
+    # Only entries on the same grid and with the same parameters are used.
+    assert db.nearest(lj, 0.6) == (None, None)
+    assert db.nearest(lj_system(n_points_exp=10), 0.6, [1]) == (None, None)
+
+    with pytest.raises(PyozError):
+        oz.WarmStartDB(str(tmpdir), n_neighbors=0)
+
+
+def test_warm_start_rhnc(tmpdir, lj_system):
+    db = oz.WarmStartDB(str(tmpdir))
+    wca_ref = oz.System(kT=2)
+    wca_ref.set_interaction(0, 0, oz.wca(wca_ref.r, eps=1, sig=1, m=12, n=6))
+    lj = lj_system()
+    e_r = lj.solve(rhos=0.6, mix_param=0.5, closure_name='RHNC',
+                   reference_system=wca_ref, warm_start=db,
+                   warm_start_params=[1])[2]
+
+    # Only the full solution is stored, not that of the reference.
+    assert len(db) == 1
+    assert np.array_equal(db.nearest(wca_ref, 0.6, [1])[0], e_r)
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+import pyoz as oz
+from pyoz.closure import supported_closures
+from pyoz.workspace import Workspace
+
+
+@pytest.mark.parametrize('closure_name', ['hnc', 'py'])
+def test_closure_out(closure_name):
+    closure = supported_closures[closure_name]
+    U_r = np.random.uniform(0, 1, size=(2, 2, 10))
+    e_r = np.random.uniform(-1, 1, size=(2, 2, 10))
+    out = np.empty_like(e_r)
+    c_r = closure(U_r, e_r, 1.5, out=out)
+    assert c_r is out
+    assert np.allclose(c_r, closure(U_r, e_r, 1.5))
+
+
+def test_workspace_reused():
+    lj = oz.System(kT=2)
+    lj.set_interaction(0, 0, oz.lennard_jones(lj.r, eps=1, sig=1))
+    g_r = lj.solve(rhos=0.6, mix_param=0.5)[0]
+    workspace = lj._get_workspace(lj.U_r.shape)
+    g_r_again = lj.solve(rhos=0.6, mix_param=0.5)[0]
+    assert lj._get_workspace(lj.U_r.shape) is workspace
+    assert g_r_again is not g_r
+    assert np.allclose(g_r, g_r_again)
+
+
+def test_workspace_slice():
+    workspace = Workspace((4, 2, 2, 10))
+    assert workspace.pairs.shape == (4, 3, 10)
+    subset = workspace[:2]
+    assert subset.c_r.shape == (2, 2, 2, 10)
+    assert np.shares_memory(subset.c_r, workspace.c_r)
+    with pytest.raises(IndexError):
+        workspace[1:]